@@ -7,6 +7,7 @@ class EvidenceInput(BaseModel):
     storage_key: str
     content_type: str
     file_name: str
+    sha256: Optional[str] = None
 
 
 class CustomerProfileInput(BaseModel):
@@ -26,3 +27,4 @@ class CaseContextInput(BaseModel):
     evidences: List[EvidenceInput]
     country: Optional[str] = "IN"
     risk_tier: Optional[str] = "medium"
+    review_fields: Optional[List[str]] = None  # set when only some fields need reasoning
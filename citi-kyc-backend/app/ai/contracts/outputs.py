@@ -10,6 +10,7 @@ class ConfidenceScore(BaseModel):
 class OCRTextBlock(BaseModel):
     page: int
     text: str
+    confidence: Optional[ConfidenceScore] = None
 
 
 class OCRResult(BaseModel):
@@ -1,21 +1,34 @@
 import base64
 from google import genai
+from google.genai import types
+
+from app.ai.instrumentation import gemini_usage, track_ai_call
+from app.ai.rate_limit import estimate_tokens, rate_limited
+from app.ai.response_cache import cached_response
+from app.ai.schema_registry import compiled_schema
 
 
 class GeminiClient:
-    def __init__(self, api_key: str, model: str = "gemini-2.0-flash"):
-        self.client = genai.Client(api_key=api_key)
+    provider = "gemini"
+
+    def __init__(self, api_key: str, model: str = "gemini-2.0-flash", http_client=None, async_http_client=None):
+        http_options = None
+        if http_client is not None or async_http_client is not None:
+            # share pooled keep-alive connections instead of the SDK's per-client defaults
+            http_options = types.HttpOptions(httpx_client=http_client, httpx_async_client=async_http_client)
+        self.client = genai.Client(api_key=api_key, http_options=http_options)
         self.model = model
 
-    def generate_structured(
+    def _request(
         self,
         prompt: str,
         schema_model,
-        temperature: float = 0.2,
-        max_output_tokens: int = 2048,
-        file_bytes: bytes | None = None,
-        mime_type: str = "application/pdf",
-    ):
+        temperature: float,
+        max_output_tokens: int,
+        file_bytes: bytes | None,
+        mime_type: str,
+        system_prompt: str | None = None,
+    ) -> dict:
         parts = [{"text": prompt}]
 
         if file_bytes:
@@ -26,18 +39,69 @@ class GeminiClient:
                 }
             })
 
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=[{
+        config = {
+            "temperature": temperature,
+            "max_output_tokens": max_output_tokens,
+            "response_mime_type": "application/json",
+            "response_schema": compiled_schema(schema_model).provider_schema(),
+        }
+        # static system prompt first, so Gemini's implicit prefix caching can reuse it
+        if system_prompt:
+            config["system_instruction"] = system_prompt
+
+        return {
+            "model": self.model,
+            "contents": [{
                 "role": "user",
                 "parts": parts
             }],
-            config={
-                "temperature": temperature,
-                "max_output_tokens": max_output_tokens,
-                "response_mime_type": "application/json",
-                "response_schema": schema_model.model_json_schema(),
-            },
+            "config": config,
+        }
+
+    @cached_response
+    def generate_structured(
+        self,
+        prompt: str,
+        schema_model,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2048,
+        file_bytes: bytes | None = None,
+        mime_type: str = "application/pdf",
+        system_prompt: str | None = None,
+        prompt_cache_key: str | None = None,
+    ):
+        response = self.client.models.generate_content(
+            **self._request(prompt, schema_model, temperature, max_output_tokens, file_bytes, mime_type, system_prompt)
         )
 
-        return schema_model.model_validate_json(response.text)
+        return compiled_schema(schema_model).parse(response.text)
+
+    @cached_response
+    async def agenerate_structured(
+        self,
+        prompt: str,
+        schema_model,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2048,
+        file_bytes: bytes | None = None,
+        mime_type: str = "application/pdf",
+        system_prompt: str | None = None,
+        prompt_cache_key: str | None = None,
+    ):
+        """
+        Same contract as generate_structured, on the SDK's async client so the
+        event loop stays free while the model responds.
+        """
+        estimated = estimate_tokens(f"{system_prompt or ''}{prompt}", file_bytes, max_output_tokens)
+        payload_bytes = len(prompt) + len(system_prompt or "") + len(file_bytes or b"")
+        async with track_ai_call(self.provider, self.model, payload_bytes) as call:
+            async with rate_limited(self.provider, self.model, estimated) as slot:
+                call.queue_wait_seconds = slot.queue_wait
+                response = await self.client.aio.models.generate_content(
+                    **self._request(prompt, schema_model, temperature, max_output_tokens, file_bytes, mime_type, system_prompt)
+                )
+                usage = getattr(response, "usage_metadata", None)
+                slot.actual_tokens = getattr(usage, "total_token_count", None)
+                gemini_usage(call, response)
+
+        return compiled_schema(schema_model).parse(response.text)
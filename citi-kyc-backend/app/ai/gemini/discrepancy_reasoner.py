@@ -66,6 +66,8 @@ For each valid discrepancy:
 
 
 class GeminiFlashDiscrepancyReasoner:
+    prompt_version = "v1"
+
     def __init__(self, gemini_client: GeminiClient):
         self.client = gemini_client
 
@@ -74,10 +76,15 @@ class GeminiFlashDiscrepancyReasoner:
         # Structured JSON still contains necessary KYC fields; keep only what is required.
         profile = ctx.customer_profile.model_dump()
         payload = ctx.form_payload
+        review = ""
+        if ctx.review_fields is not None:
+            review = f"""
+FIELDS_TO_REVIEW (all other fields already match after normalization; report discrepancies only for these):
+{_compact(ctx.review_fields)}
+"""
 
-        prompt = f"""{REASONER_SYSTEM_PROMPT}
-
-CATEGORY_ID: {ctx.category_id}
+        # REASONER_SYSTEM_PROMPT travels as the cached system prompt; only case data is sent per call
+        prompt = f"""CATEGORY_ID: {ctx.category_id}
 POLICY_VERSION: {ctx.policy_version}
 COUNTRY: {ctx.country}
 RISK_TIER: {ctx.risk_tier}
@@ -90,13 +97,15 @@ USER_FORM_PAYLOAD:
 
 EVIDENCE_LIST:
 {_compact([e.model_dump() for e in ctx.evidences])}
-"""
+{review}"""
 
-        out: GeminiReasoningOutput = self.client.generate_structured(
+        out: GeminiReasoningOutput = await self.client.agenerate_structured(
                 prompt=prompt,
                 schema_model=GeminiReasoningOutput,
                 temperature=0.15,
                 max_output_tokens=2048,
+                system_prompt=REASONER_SYSTEM_PROMPT,
+                prompt_cache_key=f"reasoner:{self.prompt_version}",
             )
         print("Gemini Flash Discrepancy Reasoner Output:", out.model_dump())
         discrepancies = [
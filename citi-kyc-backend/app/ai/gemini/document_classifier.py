@@ -2,22 +2,27 @@ from .client import GeminiClient
 from .schemas import DocClassifierSchema
 from app.ai.contracts.outputs import DocumentClassificationResult, ConfidenceScore
 
-import boto3
+from app.core.clients import shared_s3_client
 from app.core.config import settings
 from app.ai.contracts.inputs import EvidenceInput
+from app.services.doc_classifier import GeminiDocClassifierService
+from app.services.evidence_blob_loader import read_prepared_evidence
 
 
 class GeminiDocClassifierPlugin:
+    prompt_version = "v1"
+
     def __init__(self, client: GeminiClient):
         self.client = client
-        self.s3 = boto3.client("s3", region_name=settings.s3_region)
+        self.s3 = shared_s3_client()
+        self.text_service = GeminiDocClassifierService(client)
 
     def _download(self, key: str) -> bytes:
         print(f"In Downloading file for AI classifier from S3: {key}")
         return self.s3.get_object(Bucket=settings.s3_bucket, Key=key)["Body"].read()
 
     async def classify(self, evidence: EvidenceInput) -> DocumentClassificationResult:
-        file_bytes = self._download(evidence.storage_key)
+        document = await read_prepared_evidence(evidence.storage_key, self._download, evidence.content_type)
 
         prompt = """
 You are a banking KYC document classifier.
@@ -36,10 +41,11 @@ Return ONLY JSON:
 }
 """
 
-        result: DocClassifierSchema = self.client.generate_structured(
+        result: DocClassifierSchema = await self.client.agenerate_structured(
             prompt=prompt,
             schema_model=DocClassifierSchema,
-            file_bytes=file_bytes
+            file_bytes=document.data,
+            mime_type=document.mime_type,
         )
 
         return DocumentClassificationResult(
@@ -49,3 +55,7 @@ Return ONLY JSON:
                 reason="gemini_multimodal_classifier"
             ),
         )
+
+    async def classify_text(self, text: str) -> DocumentClassificationResult:
+        """Classifies OCR text (hybrid mode) instead of the uploaded file."""
+        return await self.text_service.classify(text)
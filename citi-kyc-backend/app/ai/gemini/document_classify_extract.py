@@ -0,0 +1,93 @@
+from __future__ import annotations
+from typing import List, Tuple
+
+from app.ai.contracts.inputs import EvidenceInput
+from app.ai.contracts.outputs import DocumentClassificationResult, ExtractedFields, FieldValue, ConfidenceScore
+from app.ai.gemini.client import GeminiClient
+from app.ai.gemini.schemas import ClassifyExtractSchema
+from app.core.clients import shared_s3_client
+from app.core.config import settings
+from app.services.evidence_blob_loader import read_prepared_evidence
+
+
+CLASSIFY_EXTRACT_SYSTEM_PROMPT = """
+You are a KYC document understanding AI for a regulated bank.
+
+Step 1: Identify the document type from the uploaded file.
+
+Possible types:
+passport, drivers_license, national_id, utility_bill,
+bank_statement, certificate_incorporation, tax_registration,
+sof_declaration, unknown
+
+Step 2: Extract the requested fields (listed after these instructions) directly from the same document.
+
+Rules:
+- Read the document visually.
+- If not English, translate internally before extraction.
+- In case name is split into multiple fields (given name, surname), concatenate them into a single full_name.
+- Convert fields into uppercase strings.
+- Remove any punctuation from values.
+- Remove any Mr./Ms. or any other prefixes from names.
+- Dates must be ISO format YYYY-MM-DD.
+- If a field is missing, return value=null with low confidence.
+
+Return ONLY JSON:
+{
+  "document_type": "<type>",
+  "confidence": 0.0-1.0,
+  "fields": [
+    {"field_name": "<field name>", "value": "<value or null>", "confidence": 0.0-1.0}
+  ]
+}
+"""
+
+
+def build_classify_extract_prompt(fields_to_extract: List[str]) -> str:
+    """Per-call part of the prompt; CLASSIFY_EXTRACT_SYSTEM_PROMPT carries the static instructions."""
+    fields = "\n".join([f"- {f}" for f in fields_to_extract])
+    return f"""Fields to extract:
+{fields}
+"""
+
+
+class GeminiClassifyExtractPlugin:
+    """
+    Classifies the document and extracts the requested fields in one multimodal
+    call, instead of separate classifier and extractor round trips.
+    """
+    prompt_version = "v2"
+
+    def __init__(self, client: GeminiClient):
+        self.client = client
+        self.s3 = shared_s3_client()
+
+    def _download(self, key: str) -> bytes:
+        return self.s3.get_object(Bucket=settings.s3_bucket, Key=key)["Body"].read()
+
+    async def classify_and_extract(
+        self, evidence: EvidenceInput, fields_to_extract: List[str]
+    ) -> Tuple[DocumentClassificationResult, ExtractedFields]:
+        document = await read_prepared_evidence(evidence.storage_key, self._download, evidence.content_type)
+
+        out: ClassifyExtractSchema = await self.client.agenerate_structured(
+            prompt=build_classify_extract_prompt(fields_to_extract),
+            schema_model=ClassifyExtractSchema,
+            file_bytes=document.data,
+            mime_type=document.mime_type,
+            system_prompt=CLASSIFY_EXTRACT_SYSTEM_PROMPT,
+            prompt_cache_key=f"classify_extract:{self.prompt_version}",
+        )
+
+        doc_type = DocumentClassificationResult(
+            document_type=out.document_type,
+            confidence=ConfidenceScore(value=float(out.confidence), reason="gemini_multimodal_classify_extract"),
+        )
+        fields = {
+            item.field_name: FieldValue(
+                value=item.value,
+                confidence=ConfidenceScore(value=float(item.confidence), reason="gemini_multimodal_classify_extract"),
+            )
+            for item in out.fields
+        }
+        return doc_type, ExtractedFields(fields=fields, meta={"extractor": "gemini-2.0-flash-classify-extract"})
@@ -36,7 +36,7 @@ class GeminiFlashFieldExtractor:
 DOCUMENT_TEXT:
 {safe_text}
 """
-        out: GeminiExtractedFields = self.client.generate_structured(
+        out: GeminiExtractedFields = await self.client.agenerate_structured(
             prompt=prompt,
             schema_model=GeminiExtractedFields,
             temperature=0.1,
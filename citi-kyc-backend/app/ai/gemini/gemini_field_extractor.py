@@ -1,22 +1,57 @@
 from __future__ import annotations
 import base64
 from typing import List
-import boto3
+from app.core.clients import shared_s3_client
 
 from app.ai.contracts.outputs import ExtractedFields, FieldValue, ConfidenceScore
 from app.ai.gemini.client import GeminiClient
 from app.ai.gemini.schemas import GeminiExtractedFields
 from app.core.config import settings
+from app.services.evidence_blob_loader import read_prepared_evidence
+
+
+# Static instructions go first (and into the provider's prompt cache); only the
+# field list changes between calls.
+EXTRACTOR_SYSTEM_PROMPT = """
+You are a KYC document understanding AI for a regulated bank.
+
+The user has uploaded a document (passport, license, utility bill, etc.).
+Extract structured information directly from the document.
+
+Return ONLY JSON matching schema.
+
+Output format:
+{
+"fields": [
+    {
+    "field_name": "<field name>",
+    "value": "<value or null>",
+    "confidence": 0.0-1.0
+    }
+]
+}
+
+Rules:
+- Read the document visually.
+- If not English, translate internally before extraction.
+- In case name is split into multiple fields (e.g., first name/given name, last/surname name), concatenate them into a single full_name field.
+- Convert fields into uppercase strings.
+- Remove any punctuation from values.
+- Remove any Mr./Ms. or any other prefixes from names.
+- Dates must be ISO format YYYY-MM-DD.
+- If a field is missing, return value=null with low confidence.
+"""
 
 
 class GeminiFlashFieldExtractor:
     """
     Multimodal extractor: LLM performs OCR + field extraction
     """
+    prompt_version = "v2"
 
     def __init__(self, gemini_client: GeminiClient):
         self.client = gemini_client
-        self.s3 = boto3.client("s3", region_name=settings.s3_region)
+        self.s3 = shared_s3_client()
 
     def _download_file_bytes(self, key: str) -> bytes:
         obj = self.s3.get_object(Bucket=settings.s3_bucket, Key=key)
@@ -24,62 +59,53 @@ class GeminiFlashFieldExtractor:
 
     def _build_prompt(self, fields_to_extract: List[str]) -> str:
         fields = "\n".join([f"- {f}" for f in fields_to_extract])
-        return f"""
-        You are a KYC document understanding AI for a regulated bank.
-
-        The user has uploaded a document (passport, license, utility bill, etc.).
-        Extract structured information directly from the document.
-
-        Return ONLY JSON matching schema.
-
-        Fields to extract:
-        {fields}
-
-        Output format:
-        {{
-        "fields": [
-            {{
-            "field_name": "<field name>",
-            "value": "<value or null>",
-            "confidence": 0.0-1.0
-            }}
-        ]
-        }}
-
-        Rules:
-        - Read the document visually.
-        - If not English, translate internally before extraction.
-        - Convert fields into uppercase strings.
-        - Remove any punctuation from values.
-        - Remove any Mr./Ms. or any other prefixes from names.
-        - Dates must be ISO format YYYY-MM-DD.
-        - If a field is missing, return value=null with low confidence.
-        """
-
+        return f"""Fields to extract:
+{fields}
+"""
 
     async def extract_from_evidence(self, storage_key: str, fields_to_extract: List[str]) -> ExtractedFields:
-        file_bytes = self._download_file_bytes(storage_key)
-        print(f"Downloaded {len(file_bytes)} bytes from S3 in extraction for key {storage_key}")
+        document = await read_prepared_evidence(storage_key, self._download_file_bytes)
+        print(f"Prepared {len(document.data)} bytes ({document.mime_type}) in extraction for key {storage_key}")
 
         prompt = self._build_prompt(fields_to_extract)
         #print("Gemini Flash Field Extractor Prompt:", prompt)
 
-        out: GeminiExtractedFields = self.client.generate_structured(
+        out: GeminiExtractedFields = await self.client.agenerate_structured(
             prompt=prompt,
             schema_model=GeminiExtractedFields,
-            file_bytes=file_bytes  # NEW: multimodal input
+            file_bytes=document.data,  # NEW: multimodal input
+            mime_type=document.mime_type,
+            system_prompt=EXTRACTOR_SYSTEM_PROMPT,
+            prompt_cache_key=f"extractor:{self.prompt_version}",
         )
         print("Gemini Flash Field Extractor Output:", out)
+        return self._to_fields(out, "gemini_multimodal_extractor", "gemini-2.0-flash-multimodal")
+
+    async def extract_from_text(self, text: str, fields_to_extract: List[str]) -> ExtractedFields:
+        """Extracts from OCR (or translated) text; hybrid mode's cheap path."""
+        prompt = f"""{self._build_prompt(fields_to_extract)}
+The document is provided as OCR text instead of a file.
+
+DOCUMENT_TEXT:
+{text}
+"""
+        out: GeminiExtractedFields = await self.client.agenerate_structured(
+            prompt=prompt,
+            schema_model=GeminiExtractedFields,
+            system_prompt=EXTRACTOR_SYSTEM_PROMPT,
+            prompt_cache_key=f"extractor:{self.prompt_version}",
+        )
+        return self._to_fields(out, "gemini_text_extractor", "gemini-2.0-flash-text")
+
+    def _to_fields(self, out: GeminiExtractedFields, reason: str, extractor: str) -> ExtractedFields:
         fields = {
             item.field_name: FieldValue(
                 value=item.value,
                 confidence=ConfidenceScore(
                     value=float(item.confidence),
-                    reason="gemini_multimodal_extractor"
+                    reason=reason
                 )
             )
             for item in out.fields
         }
-
-
-        return ExtractedFields(fields=fields, meta={"extractor": "gemini-2.0-flash-multimodal"})
+        return ExtractedFields(fields=fields, meta={"extractor": extractor})
@@ -56,3 +56,20 @@ class DocClassifierSchema(BaseModel):
     document_type: str = Field(description="Predicted document type")
     confidence: float = Field(ge=0.0, le=1.0, description="Model confidence between 0 and 1")
 
+
+class ClassifyExtractSchema(BaseModel):
+    """
+    Structured response for the single-call classify + extract mode
+    """
+    document_type: str = Field(description="Predicted document type")
+    confidence: float = Field(ge=0.0, le=1.0, description="Classification confidence between 0 and 1")
+    fields: List[GeminiFieldItem]
+
+
+class TranslationSchema(BaseModel):
+    """
+    Structured response for OCR text translation
+    """
+    source_language: str = Field(description="Detected source language")
+    translated_text: str = Field(description="Text translated to English")
+    confidence: float = Field(ge=0.0, le=1.0, description="Translation confidence between 0 and 1")
@@ -0,0 +1,209 @@
+from __future__ import annotations
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+# Tags (case_id, evidence_id, stage, attempt, hedge) for every AI call made in the current context.
+# asyncio tasks copy the context when created, so per-evidence tasks inherit the case tags.
+_tags: contextvars.ContextVar[dict] = contextvars.ContextVar("ai_call_tags", default={})
+_collector: contextvars.ContextVar[Optional[List["AICallRecord"]]] = contextvars.ContextVar(
+    "ai_call_collector", default=None
+)
+# Method name -> (provider, model, prompt_version) of the plugin that actually answered it;
+# with fallback or hedging that is not necessarily the registry's primary plugin
+_served_by: contextvars.ContextVar[Optional[Dict[str, tuple]]] = contextvars.ContextVar("ai_served_by", default=None)
+
+# Upper bounds; the last bucket is open-ended
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64, 128)
+TOKEN_BUCKETS = (256, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536)
+
+
+@contextmanager
+def ai_call_tags(**tags):
+    token = _tags.set({**_tags.get(), **tags})
+    try:
+        yield
+    finally:
+        _tags.reset(token)
+
+
+def ai_call_tag(name: str, default=None):
+    return _tags.get().get(name, default)
+
+
+@contextmanager
+def collect_ai_calls():
+    """Collects every AICallRecord made in this context (e.g. one validation run)."""
+    calls: List[AICallRecord] = []
+    token = _collector.set(calls)
+    try:
+        yield calls
+    finally:
+        _collector.reset(token)
+
+
+@contextmanager
+def track_served_by():
+    """Collects which plugin served each AI method called in this context (e.g. one evidence)."""
+    served: Dict[str, tuple] = {}
+    token = _served_by.set(served)
+    try:
+        yield served
+    finally:
+        _served_by.reset(token)
+
+
+def record_served_by(method: str, identity: tuple):
+    served = _served_by.get()
+    if served is not None:
+        served[method] = identity
+
+
+@dataclass
+class AICallRecord:
+    provider: str
+    model: str
+    stage: Optional[str] = None
+    case_id: Optional[str] = None
+    evidence_id: Optional[str] = None
+    attempt: int = 0  # 0 = first try; >0 = retry number
+    wall_seconds: float = 0.0
+    queue_wait_seconds: float = 0.0
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    cached_tokens: Optional[int] = None
+    payload_bytes: int = 0
+    cost_usd: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_payload(self) -> dict:
+        payload = asdict(self)
+        payload["wall_seconds"] = round(self.wall_seconds, 4)
+        payload["queue_wait_seconds"] = round(self.queue_wait_seconds, 4)
+        return payload
+
+
+def estimate_cost(model: str, input_tokens: Optional[int], output_tokens: Optional[int], cached_tokens: Optional[int]) -> Optional[float]:
+    """USD from `ai_model_prices` (per million tokens); None for unpriced models."""
+    prices = settings.ai_model_prices.get(model)
+    if not prices or input_tokens is None:
+        return None
+    cached = cached_tokens or 0
+    cost = (
+        (input_tokens - cached) * prices["input"]
+        + cached * prices.get("cached_input", prices["input"])
+        + (output_tokens or 0) * prices["output"]
+    )
+    return round(cost / 1_000_000, 8)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.n += 1
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{b}" for b in self.buckets] + ["inf"]
+        return {"count": self.n, "sum": round(self.total, 4), "buckets": dict(zip(labels, self.counts))}
+
+
+_histograms: Dict[tuple, Histogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def _observe(record: AICallRecord, metric: str, value: Optional[float], buckets: tuple):
+    if value is None:
+        return
+    key = (record.provider, record.model, record.stage or "unknown", metric)
+    with _histograms_lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = Histogram(buckets)
+            _histograms[key] = hist
+        hist.observe(value)
+
+
+def ai_call_metrics() -> dict:
+    """Histogram snapshots keyed "provider/model/stage/metric", merged into registry_metrics()."""
+    with _histograms_lock:
+        return {"/".join(key): hist.snapshot() for key, hist in _histograms.items()}
+
+
+def reset_ai_call_metrics():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def _finish(record: AICallRecord):
+    record.cost_usd = estimate_cost(record.model, record.input_tokens, record.output_tokens, record.cached_tokens)
+    _observe(record, "wall_seconds", record.wall_seconds, LATENCY_BUCKETS)
+    _observe(record, "queue_wait_seconds", record.queue_wait_seconds, LATENCY_BUCKETS)
+    _observe(record, "input_tokens", record.input_tokens, TOKEN_BUCKETS)
+    _observe(record, "output_tokens", record.output_tokens, TOKEN_BUCKETS)
+
+    calls = _collector.get()
+    if calls is not None:
+        calls.append(record)
+    if settings.ai_call_log_enabled:
+        print(
+            f"AI call {record.provider}/{record.model} stage={record.stage} case={record.case_id} "
+            f"evidence={record.evidence_id} attempt={record.attempt} wall={record.wall_seconds:.3f}s "
+            f"queue={record.queue_wait_seconds:.3f}s tokens={record.input_tokens}/{record.output_tokens} "
+            f"bytes={record.payload_bytes} cost={record.cost_usd} error={record.error}"
+        )
+
+
+@asynccontextmanager
+async def track_ai_call(provider: str, model: str, payload_bytes: int):
+    """Times one provider call; the caller fills in queue wait and token usage."""
+    tags = _tags.get()
+    record = AICallRecord(
+        provider=provider,
+        model=model,
+        stage=tags.get("stage"),
+        case_id=tags.get("case_id"),
+        evidence_id=tags.get("evidence_id"),
+        attempt=tags.get("attempt", 0),
+        payload_bytes=payload_bytes,
+    )
+    start = time.monotonic()
+    try:
+        yield record
+    except BaseException as e:
+        record.error = type(e).__name__
+        raise
+    finally:
+        record.wall_seconds = time.monotonic() - start
+        _finish(record)
+
+
+def gemini_usage(record: AICallRecord, response):
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    record.input_tokens = getattr(usage, "prompt_token_count", None)
+    record.output_tokens = getattr(usage, "candidates_token_count", None)
+    record.cached_tokens = getattr(usage, "cached_content_token_count", None)
+
+
+def openai_usage(record: AICallRecord, response):
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    record.input_tokens = getattr(usage, "prompt_tokens", None)
+    record.output_tokens = getattr(usage, "completion_tokens", None)
+    details = getattr(usage, "prompt_tokens_details", None)
+    record.cached_tokens = getattr(details, "cached_tokens", None)
@@ -1,11 +1,27 @@
+import asyncio
+
 from app.ai.contracts.inputs import EvidenceInput
 from app.ai.contracts.outputs import DocumentClassificationResult, ConfidenceScore
 
 
 class MockDocClassifier:
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+
     async def classify(self, evidence: EvidenceInput) -> DocumentClassificationResult:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+
+        return self._guess(evidence.file_name)
+
+    async def classify_text(self, text: str) -> DocumentClassificationResult:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return self._guess(text)
+
+    def _guess(self, name: str) -> DocumentClassificationResult:
         # naïve mapping just for skeleton
-        name = evidence.file_name.lower()
+        name = name.lower()
         doc_type = "unknown"
         if "passport" in name:
             doc_type = "passport"
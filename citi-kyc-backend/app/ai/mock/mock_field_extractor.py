@@ -1,7 +1,13 @@
+import asyncio
+from typing import List
+
 from app.ai.contracts.outputs import ExtractedFields, FieldValue, ConfidenceScore
 
 
 class MockFieldExtractor:
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+
     async def extract(self, text: str) -> ExtractedFields:
         # Very basic stub
         return ExtractedFields(
@@ -12,3 +18,14 @@ class MockFieldExtractor:
             },
             meta={"extractor": "mock"}
         )
+
+    async def extract_from_evidence(self, storage_key: str, fields_to_extract: List[str]) -> ExtractedFields:
+        # Simulated provider latency, so pipeline timings can be measured offline
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return await self.extract(storage_key)
+
+    async def extract_from_text(self, text: str, fields_to_extract: List[str]) -> ExtractedFields:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return await self.extract(text)
@@ -1,12 +1,113 @@
 import base64
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+
+from app.ai.instrumentation import openai_usage, track_ai_call
+from app.ai.rate_limit import estimate_tokens, rate_limited
+from app.ai.response_cache import cached_response
+from app.ai.schema_registry import compiled_schema
+from app.core.config import settings
+
+
+_FILE_NAMES = {"application/pdf": "document.pdf"}
+
+
+def data_url(mime_type: str, data: bytes) -> str:
+    """
+    base64 data URL. The raw bytes, this string (4/3 their size) and the
+    serialized request body all stay in memory until the call returns; PDFs
+    above openai_file_upload_min_bytes go through the Files API instead.
+    """
+    return "data:%s;base64,%s" % (mime_type, base64.b64encode(data).decode("ascii"))
 
 
 class OpenAIClient:
-    def __init__(self, api_key: str, model: str = "gpt-4.1"):
-        self.client = OpenAI(api_key=api_key)
+    provider = "openai"
+
+    def __init__(self, api_key: str, model: str = "gpt-4.1", http_client=None, async_http_client=None):
+        self.client = OpenAI(api_key=api_key, http_client=http_client)
+        self.async_client = AsyncOpenAI(api_key=api_key, http_client=async_http_client)
         self.model = model
 
+    @staticmethod
+    def _should_upload(file_bytes: bytes | None, mime_type: str) -> bool:
+        # large non-image documents go through the Files API (streamed multipart)
+        # instead of a base64 copy inside the JSON request body
+        return bool(file_bytes) and not mime_type.startswith("image/") and len(file_bytes) >= settings.openai_file_upload_min_bytes
+
+    def _upload(self, file_bytes: bytes, mime_type: str) -> str:
+        uploaded = self.client.files.create(
+            file=(_FILE_NAMES.get(mime_type, "document"), file_bytes, mime_type), purpose="user_data"
+        )
+        return uploaded.id
+
+    async def _aupload(self, file_bytes: bytes, mime_type: str) -> str:
+        uploaded = await self.async_client.files.create(
+            file=(_FILE_NAMES.get(mime_type, "document"), file_bytes, mime_type), purpose="user_data"
+        )
+        return uploaded.id
+
+    async def _adelete(self, file_id: str):
+        try:
+            await self.async_client.files.delete(file_id)
+        except Exception as e:
+            print(f"Failed to delete uploaded OpenAI file {file_id}: {e}")
+
+    def _request(
+        self,
+        prompt: str,
+        temperature: float,
+        max_output_tokens: int,
+        file_bytes: bytes | None,
+        mime_type: str,
+        system_prompt: str | None = None,
+        prompt_cache_key: str | None = None,
+        file_id: str | None = None,
+    ) -> dict:
+        content: str | list = prompt
+
+        # documents travel as real content parts, not as base64 text in the prompt
+        if file_id or file_bytes:
+            content = [{"type": "text", "text": prompt}]
+        if file_id:
+            content.append({"type": "file", "file": {"file_id": file_id}})
+        elif file_bytes:
+            if mime_type.startswith("image/"):
+                content.append({
+                    "type": "image_url",
+                    "image_url": {"url": data_url(mime_type, file_bytes), "detail": settings.openai_image_detail},
+                })
+            else:
+                content.append({
+                    "type": "file",
+                    "file": {
+                        "filename": _FILE_NAMES.get(mime_type, "document"),
+                        "file_data": data_url(mime_type, file_bytes),
+                    },
+                })
+
+        messages = [
+            {"role": "user", "content": content}
+        ]
+
+        # static system prompt first: OpenAI caches identical prompt prefixes automatically
+        if system_prompt:
+            messages.insert(0, {"role": "system", "content": system_prompt})
+
+        request = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_output_tokens,
+            "response_format": {
+                "type": "json_object"
+            },
+        }
+        if prompt_cache_key and settings.ai_prompt_cache_enabled:
+            # routes requests sharing the prefix to the same cache shard
+            request["prompt_cache_key"] = prompt_cache_key
+        return request
+
+    @cached_response
     def generate_structured(
         self,
         prompt: str,
@@ -15,26 +116,54 @@ class OpenAIClient:
         max_output_tokens: int = 2048,
         file_bytes: bytes | None = None,
         mime_type: str = "application/pdf",
+        system_prompt: str | None = None,
+        prompt_cache_key: str | None = None,
     ):
-        messages = [
-            {"role": "user", "content": prompt}
-        ]
-
-        # If you want to include file content, encode it and append to the prompt
-        if file_bytes:
-            file_content = base64.b64encode(file_bytes).decode()
-            messages[0]["content"] = (
-                f"{prompt}\n\n[BASE64_{mime_type}]: {file_content}"
+        file_id = self._upload(file_bytes, mime_type) if self._should_upload(file_bytes, mime_type) else None
+        try:
+            response = self.client.chat.completions.create(
+                **self._request(prompt, temperature, max_output_tokens, file_bytes, mime_type, system_prompt, prompt_cache_key, file_id)
             )
+        finally:
+            if file_id:
+                try:
+                    self.client.files.delete(file_id)
+                except Exception as e:
+                    print(f"Failed to delete uploaded OpenAI file {file_id}: {e}")
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_output_tokens,
-            response_format={
-                "type": "json_object"
-            },
-        )
+        return compiled_schema(schema_model).parse(response.choices[0].message.content)
+
+    @cached_response
+    async def agenerate_structured(
+        self,
+        prompt: str,
+        schema_model,
+        temperature: float = 0.2,
+        max_output_tokens: int = 2048,
+        file_bytes: bytes | None = None,
+        mime_type: str = "application/pdf",
+        system_prompt: str | None = None,
+        prompt_cache_key: str | None = None,
+    ):
+        """
+        Same contract as generate_structured, on AsyncOpenAI so the event loop
+        stays free while the model responds.
+        """
+        estimated = estimate_tokens(f"{system_prompt or ''}{prompt}", file_bytes, max_output_tokens)
+        payload_bytes = len(prompt) + len(system_prompt or "") + len(file_bytes or b"")
+        async with track_ai_call(self.provider, self.model, payload_bytes) as call:
+            async with rate_limited(self.provider, self.model, estimated) as slot:
+                call.queue_wait_seconds = slot.queue_wait
+                file_id = await self._aupload(file_bytes, mime_type) if self._should_upload(file_bytes, mime_type) else None
+                try:
+                    response = await self.async_client.chat.completions.create(
+                        **self._request(prompt, temperature, max_output_tokens, file_bytes, mime_type, system_prompt, prompt_cache_key, file_id)
+                    )
+                finally:
+                    if file_id:
+                        await self._adelete(file_id)
+                usage = getattr(response, "usage", None)
+                slot.actual_tokens = getattr(usage, "total_tokens", None)
+                openai_usage(call, response)
 
-        return schema_model.model_validate_json(response.choices[0].message.content)
\ No newline at end of file
+        return compiled_schema(schema_model).parse(response.choices[0].message.content)
@@ -0,0 +1,42 @@
+from app.ai.contracts.outputs import DocumentClassificationResult, ExtractedFields, FieldValue, ConfidenceScore
+from app.ai.gemini.document_classify_extract import CLASSIFY_EXTRACT_SYSTEM_PROMPT, build_classify_extract_prompt
+from app.ai.gemini.schemas import ClassifyExtractSchema
+from app.core.clients import shared_s3_client
+from app.core.config import settings
+from app.services.evidence_blob_loader import read_prepared_evidence
+
+
+class OpenAIClassifyExtractPlugin:
+    prompt_version = "v2"
+
+    def __init__(self, client):
+        self.client = client
+        self.s3 = shared_s3_client()
+
+    def _download(self, key):
+        return self.s3.get_object(Bucket=settings.s3_bucket, Key=key)["Body"].read()
+
+    async def classify_and_extract(self, evidence, fields_to_extract: list[str]):
+        document = await read_prepared_evidence(evidence.storage_key, self._download, evidence.content_type)
+
+        out: ClassifyExtractSchema = await self.client.agenerate_structured(
+            prompt=build_classify_extract_prompt(fields_to_extract),
+            schema_model=ClassifyExtractSchema,
+            file_bytes=document.data,
+            mime_type=document.mime_type,
+            system_prompt=CLASSIFY_EXTRACT_SYSTEM_PROMPT,
+            prompt_cache_key=f"classify_extract:{self.prompt_version}",
+        )
+
+        doc_type = DocumentClassificationResult(
+            document_type=out.document_type,
+            confidence=ConfidenceScore(value=out.confidence, reason="openai_multimodal_classify_extract"),
+        )
+        fields = {
+            item.field_name: FieldValue(
+                value=item.value,
+                confidence=ConfidenceScore(value=item.confidence, reason="openai_multimodal_classify_extract")
+            )
+            for item in out.fields
+        }
+        return doc_type, ExtractedFields(fields=fields, meta={"extractor": "openai-classify-extract"})
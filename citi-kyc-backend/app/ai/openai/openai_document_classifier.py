@@ -1,19 +1,23 @@
-import boto3
+from app.core.clients import shared_s3_client
 from app.ai.gemini.schemas import DocClassifierSchema
 from app.ai.contracts.outputs import DocumentClassificationResult, ConfidenceScore
 from app.core.config import settings
+from app.services.doc_classifier import DOC_CLASS_PROMPT
+from app.services.evidence_blob_loader import read_prepared_evidence
 
 
 class OpenAIDocClassifier:
+    prompt_version = "v1"
+
     def __init__(self, client):
         self.client = client
-        self.s3 = boto3.client("s3", region_name=settings.s3_region)
+        self.s3 = shared_s3_client()
 
     def _download(self, key):
         return self.s3.get_object(Bucket=settings.s3_bucket, Key=key)["Body"].read()
 
     async def classify(self, evidence):
-        file_bytes = self._download(evidence.storage_key)
+        document = await read_prepared_evidence(evidence.storage_key, self._download, evidence.content_type)
 
         prompt = """
         You are a banking KYC document classifier.
@@ -32,13 +36,25 @@ class OpenAIDocClassifier:
         }
 """
 
-        result: DocClassifierSchema = self.client.generate_structured(
+        result: DocClassifierSchema = await self.client.agenerate_structured(
             prompt=prompt,
             schema_model=DocClassifierSchema,
-            file_bytes=file_bytes,
+            file_bytes=document.data,
+            mime_type=document.mime_type,
         )
 
         return DocumentClassificationResult(
             document_type=result.document_type,
             confidence=ConfidenceScore(value=result.confidence, reason="openai_multimodal_classifier"),
         )
+
+    async def classify_text(self, text: str) -> DocumentClassificationResult:
+        result: DocClassifierSchema = await self.client.agenerate_structured(
+            prompt=f"{DOC_CLASS_PROMPT}\n\nTEXT:\n{text}",
+            schema_model=DocClassifierSchema,
+        )
+
+        return DocumentClassificationResult(
+            document_type=result.document_type,
+            confidence=ConfidenceScore(value=result.confidence, reason="openai_text_classifier"),
+        )
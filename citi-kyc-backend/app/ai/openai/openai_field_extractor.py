@@ -1,67 +1,69 @@
-import boto3
+from app.core.clients import shared_s3_client
 from app.ai.contracts.outputs import ExtractedFields, FieldValue, ConfidenceScore
+from app.ai.gemini.gemini_field_extractor import EXTRACTOR_SYSTEM_PROMPT
 from app.ai.gemini.schemas import GeminiExtractedFields
 from app.core.config import settings
+from app.services.evidence_blob_loader import read_prepared_evidence
 
 
 class OpenAIFieldExtractor:
+    prompt_version = "v2"
+
     def __init__(self, client):
         self.client = client
-        self.s3 = boto3.client("s3", region_name=settings.s3_region)
+        self.s3 = shared_s3_client()
 
     def _download(self, key):
         return self.s3.get_object(Bucket=settings.s3_bucket, Key=key)["Body"].read()
 
     async def extract_from_evidence(self, storage_key: str, fields_to_extract: list[str]) -> ExtractedFields:
-        file_bytes = self._download(storage_key)
+        document = await read_prepared_evidence(storage_key, self._download)
 
-        prompt = f"""
-You are a KYC document understanding AI for a regulated bank.
+        fields = "\n".join([f"- {f}" for f in fields_to_extract])
+        prompt = f"""Fields to extract:
+{fields}
 
-        The user has uploaded a document (passport, license, utility bill, etc.).
-        Extract structured information directly from the document.
-        In case name is splitted into multiple fields (e.g., first name/given name, last/surname name), concatenate them into a single full_name field.
+Return JSON only.
+"""
 
-        Return ONLY JSON matching schema.
+        out: GeminiExtractedFields = await self.client.agenerate_structured(
+            prompt=prompt,
+            schema_model=GeminiExtractedFields,
+            file_bytes=document.data,
+            mime_type=document.mime_type,
+            system_prompt=EXTRACTOR_SYSTEM_PROMPT,
+            prompt_cache_key=f"extractor:{self.prompt_version}",
+        )
 
-        Fields to extract:
-        {fields_to_extract}
+        return self._to_fields(out, "openai_multimodal", "openai")
 
-        Output format:
-        {{
-        "fields": [
-            {{
-            "field_name": "<field name>",
-            "value": "<value or null>",
-            "confidence": 0.0-1.0
-            }}
-        ]
-        }}
+    async def extract_from_text(self, text: str, fields_to_extract: list[str]) -> ExtractedFields:
+        fields = "\n".join([f"- {f}" for f in fields_to_extract])
+        prompt = f"""Fields to extract:
+{fields}
+The document is provided as OCR text instead of a file.
 
-        Rules:
-        - Read the document visually.
-        - If not English, translate internally before extraction.
-        - Convert fields into uppercase strings.
-        - Remove any punctuation from values.
-        - Remove any Mr./Ms. or any other prefixes from names.
-        - Dates must be ISO format YYYY-MM-DD.
-        - If a field is missing, return value=null with low confidence.
+DOCUMENT_TEXT:
+{text}
 
 Return JSON only.
 """
 
-        out: GeminiExtractedFields = self.client.generate_structured(
+        out: GeminiExtractedFields = await self.client.agenerate_structured(
             prompt=prompt,
             schema_model=GeminiExtractedFields,
-            file_bytes=file_bytes,
+            system_prompt=EXTRACTOR_SYSTEM_PROMPT,
+            prompt_cache_key=f"extractor:{self.prompt_version}",
         )
+        return self._to_fields(out, "openai_text", "openai-text")
 
+    def _to_fields(self, out: GeminiExtractedFields, reason: str, extractor: str) -> ExtractedFields:
         fields = {
             item.field_name: FieldValue(
                 value=item.value,
-                confidence=ConfidenceScore(value=item.confidence, reason="openai_multimodal")
+                confidence=ConfidenceScore(value=item.confidence, reason=reason)
             )
             for item in out.fields
         }
 
-        return ExtractedFields(fields=fields, meta={"extractor": "openai"})
+        return ExtractedFields(fields=fields, meta={"extractor": extractor})
@@ -1,11 +1,11 @@
 from app.ai.contracts.inputs import EvidenceInput
 from app.ai.contracts.outputs import OCRResult
-from app.services.ocr_service import OCRService, TesseractOCRProvider
+from app.services.ocr_service import OCRService, build_ocr_provider
 
 
 class DefaultOCRPlugin:
     def __init__(self):
-        self.service = OCRService(provider=TesseractOCRProvider())
+        self.service = OCRService(provider=build_ocr_provider())
 
     async def run(self, evidence: EvidenceInput) -> OCRResult:
         return await self.service.run(evidence)
@@ -0,0 +1,255 @@
+from __future__ import annotations
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+
+def is_throttled(exc: BaseException) -> bool:
+    """True for provider quota / rate-limit errors (HTTP 429, RESOURCE_EXHAUSTED)."""
+    for attr in ("status_code", "code", "status"):
+        if getattr(exc, attr, None) in (429, "429", "RESOURCE_EXHAUSTED"):
+            return True
+    text = str(exc)
+    return "RESOURCE_EXHAUSTED" in text or "Too Many Requests" in text
+
+
+def estimate_tokens(prompt: str, file_bytes: bytes | None, max_output_tokens: int) -> int:
+    # ~4 chars per text token; inline documents are billed per image/page, ~258 tokens each
+    file_tokens = 0
+    if file_bytes:
+        file_tokens = 258 * max(1, len(file_bytes) // (256 * 1024))
+    return len(prompt) // 4 + file_tokens + max_output_tokens
+
+
+class TokenBucket:
+    """In-process token bucket; `rate_per_minute` tokens refill continuously."""
+
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float) -> float:
+        amount = min(amount, self.capacity)
+        start = time.monotonic()
+        # the lock keeps waiters FIFO
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return time.monotonic() - start
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    async def adjust(self, delta: float):
+        """Debits (or refunds) the difference between estimated and actual usage."""
+        async with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+
+_REDIS_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local wait = 0
+if tokens >= amount then
+  tokens = tokens - amount
+else
+  wait = (amount - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+# Settles actual against estimated usage: refunds are credited (up to capacity)
+# and overruns debited even below zero, so later acquires wait them off
+_REDIS_ADJUST_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local delta = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate - delta)
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(tokens)
+"""
+
+
+class RedisTokenBucket:
+    """
+    Token bucket shared by every worker through Redis. Refill and debit happen
+    atomically in a Lua script using the Redis server clock.
+    """
+
+    def __init__(self, redis_client, key: str, rate_per_minute: float):
+        self.key = key
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(rate_per_minute)
+        self._script = redis_client.register_script(_REDIS_BUCKET_LUA)
+        self._adjust_script = redis_client.register_script(_REDIS_ADJUST_LUA)
+
+    async def acquire(self, amount: float) -> float:
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            delay = float(await self._script(keys=[self.key], args=[self.rate, self.capacity, amount]))
+            if delay <= 0:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    async def adjust(self, delta: float):
+        """Debits (or refunds) the difference between estimated and actual usage."""
+        if delta:
+            await self._adjust_script(keys=[self.key], args=[self.rate, self.capacity, delta])
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limit: +1 per window of successful calls, halved on throttling
+    (at most once per `cooldown` seconds so one burst of 429s counts once).
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, cooldown: float = 1.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> float:
+        start = time.monotonic()
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return time.monotonic() - start
+
+    async def release(self, throttled: bool):
+        async with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if throttled:
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(float(self.minimum), self.limit / 2)
+                    self._last_decrease = now
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1.0 / max(self.limit, 1.0))
+            self._cond.notify_all()
+
+
+@dataclass
+class LimiterSlot:
+    estimated_tokens: int
+    queue_wait: float = 0.0
+    actual_tokens: Optional[int] = None
+
+
+class ProviderRateLimiter:
+    """Requests/min + tokens/min budgets and adaptive concurrency for one provider/model."""
+
+    def __init__(self, rpm_bucket, tpm_bucket, concurrency: AdaptiveConcurrency):
+        self.rpm = rpm_bucket
+        self.tpm = tpm_bucket
+        self.concurrency = concurrency
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int):
+        slot = LimiterSlot(estimated_tokens=estimated_tokens)
+        slot.queue_wait += await self.concurrency.acquire()
+        throttled = False
+        try:
+            if self.rpm is not None:
+                slot.queue_wait += await self.rpm.acquire(1)
+            if self.tpm is not None:
+                slot.queue_wait += await self.tpm.acquire(estimated_tokens)
+            yield slot
+        except BaseException as e:
+            throttled = is_throttled(e)
+            raise
+        finally:
+            await self.concurrency.release(throttled)
+            if self.tpm is not None and slot.actual_tokens is not None:
+                await self.tpm.adjust(slot.actual_tokens - estimated_tokens)
+
+
+_limiters: Dict[tuple, ProviderRateLimiter] = {}
+_redis_client = None
+
+
+def _limits_for(provider: str, model: str) -> dict:
+    limits = settings.ai_rate_limits
+    return limits.get(f"{provider}:{model}") or limits.get(provider) or {}
+
+
+def _bucket(provider: str, model: str, kind: str, per_minute: Optional[float]):
+    global _redis_client
+    if not per_minute:
+        return None
+    if settings.ai_rate_limit_redis_url:
+        if _redis_client is None:
+            import redis.asyncio as redis
+            _redis_client = redis.from_url(settings.ai_rate_limit_redis_url)
+        return RedisTokenBucket(_redis_client, f"kyc:ratelimit:{provider}:{model}:{kind}", per_minute)
+    return TokenBucket(per_minute)
+
+
+def get_rate_limiter(provider: str, model: str) -> Optional[ProviderRateLimiter]:
+    if not settings.ai_rate_limit_enabled:
+        return None
+    key = (provider, model)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limits = _limits_for(provider, model)
+        limiter = ProviderRateLimiter(
+            rpm_bucket=_bucket(provider, model, "rpm", limits.get("rpm")),
+            tpm_bucket=_bucket(provider, model, "tpm", limits.get("tpm")),
+            concurrency=AdaptiveConcurrency(
+                initial=settings.ai_max_concurrency,
+                minimum=settings.ai_min_concurrency,
+                maximum=settings.ai_max_concurrency,
+            ),
+        )
+        _limiters[key] = limiter
+    return limiter
+
+
+def reset_rate_limiters():
+    """Drops limiters (and the Redis connection) inherited across a fork."""
+    global _redis_client
+    _limiters.clear()
+    _redis_client = None
+
+
+@asynccontextmanager
+async def rate_limited(provider: str, model: str, estimated_tokens: int):
+    limiter = get_rate_limiter(provider, model)
+    if limiter is None:
+        yield LimiterSlot(estimated_tokens=estimated_tokens)
+        return
+    async with limiter.slot(estimated_tokens) as slot:
+        yield slot
@@ -1,4 +1,5 @@
 import os
+import threading
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
@@ -14,10 +15,27 @@ from app.ai.gemini.client import GeminiClient
 
 from app.ai.gemini.gemini_field_extractor import GeminiFlashFieldExtractor
 from app.ai.gemini.discrepancy_reasoner import GeminiFlashDiscrepancyReasoner
+from app.ai.gemini.document_classify_extract import GeminiClassifyExtractPlugin
 from app.ai.openai.client import OpenAIClient
 from app.ai.openai.openai_field_extractor import OpenAIFieldExtractor
 from app.ai.openai.openai_document_classifier import OpenAIDocClassifier
 from app.ai.openai.openai_discrepancy_reasoner import OpenAIDiscrepancyReasoner
+from app.ai.openai.openai_classify_extract import OpenAIClassifyExtractPlugin
+from app.ai.mock.mock_doc_classifier import MockDocClassifier
+from app.ai.mock.mock_field_extractor import MockFieldExtractor
+from app.ai.mock.mock_reasoner import MockDiscrepancyReasoner
+from app.ai.mock.mock_ocr import MockOCR
+from app.ai.mock.mock_translation import MockTranslation
+from app.ai.instrumentation import ai_call_metrics
+from app.ai.response_cache import response_cache_metrics
+from app.ai.resilience import ResilientPlugin, reset_resilience_state, resilience_metrics
+from app.core.config import settings
+from app.core.clients import (
+    connection_metrics,
+    pooled_async_http_client,
+    pooled_http_client,
+    reset_shared_clients,
+)
 
 
 load_dotenv()
@@ -27,23 +45,140 @@ class AIRegistry:
     classifier: object
     extractor: object
     reasoner: object
+    combined: object = None  # single-call classify + extract, used when AI_PIPELINE_MODE=combined
+    ocr: object = None  # local OCR, the first step of AI_PIPELINE_MODE=hybrid
+    translation: object = None  # non-English OCR text only; without it such documents go multimodal
 
 
-def get_registry() -> AIRegistry:
-    provider = os.getenv("AI_PROVIDER", "gemini")
-
-    if provider == "openai":
-        client = OpenAIClient(api_key=os.getenv("OPENAI_API_KEY"))
+def _build_provider(provider: str) -> AIRegistry:
+    if provider == "mock":
+        # Offline providers; MOCK_AI_LATENCY_SECONDS simulates per-call LLM latency
+        latency = float(os.getenv("MOCK_AI_LATENCY_SECONDS", "0"))
+        return AIRegistry(
+            classifier=MockDocClassifier(latency_seconds=latency),
+            extractor=MockFieldExtractor(latency_seconds=latency),
+            reasoner=MockDiscrepancyReasoner(),
+            ocr=MockOCR(),
+            translation=MockTranslation(),
+        )
+    elif provider == "openai":
+        client = OpenAIClient(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=pooled_http_client("openai"),
+            async_http_client=pooled_async_http_client("openai"),
+        )
         return AIRegistry(
             classifier=OpenAIDocClassifier(client),
             extractor=OpenAIFieldExtractor(client),
             reasoner=OpenAIDiscrepancyReasoner(client),
+            combined=OpenAIClassifyExtractPlugin(client),
+            ocr=DefaultOCRPlugin(),
         )
     else:
         # Default Gemini
-        client = GeminiClient(api_key=os.getenv("GEMINI_API_KEY"))
+        client = GeminiClient(
+            api_key=os.getenv("GEMINI_API_KEY"),
+            http_client=pooled_http_client("gemini"),
+            async_http_client=pooled_async_http_client("gemini"),
+        )
         return AIRegistry(
             classifier=GeminiDocClassifierPlugin(client),
             extractor=GeminiFlashFieldExtractor(client),
             reasoner=GeminiFlashDiscrepancyReasoner(client),
+            combined=GeminiClassifyExtractPlugin(client),
+            ocr=DefaultOCRPlugin(),
+            translation=GeminiTranslationPlugin(client),
         )
+
+
+def _build_registry() -> AIRegistry:
+    provider = os.getenv("AI_PROVIDER", "gemini")
+    primary = _build_provider(provider)
+    if not settings.ai_resilience_enabled:
+        return primary
+
+    # Optional secondary provider, used when the primary fails or its circuit is open
+    fallback = os.getenv("AI_FALLBACK_PROVIDER")
+    secondary = _build_provider(fallback) if fallback and fallback != provider else None
+
+    def wrap(slot: str):
+        plugin = getattr(primary, slot)
+        if plugin is None:
+            return None
+        return ResilientPlugin(plugin, getattr(secondary, slot) if secondary else None)
+
+    return AIRegistry(
+        classifier=wrap("classifier"),
+        extractor=wrap("extractor"),
+        reasoner=wrap("reasoner"),
+        combined=wrap("combined"),
+        ocr=primary.ocr,  # local; retries and provider fallback do not apply
+        translation=wrap("translation"),
+    )
+
+
+# Built once per worker process and reused by every task it runs
+_registry: AIRegistry | None = None
+_registry_pid: int | None = None
+_registry_lock = threading.Lock()
+_registry_stats = {"builds": 0, "reuses": 0}
+
+
+def get_registry() -> AIRegistry:
+    global _registry, _registry_pid
+    pid = os.getpid()
+    registry = _registry
+    if registry is not None and _registry_pid == pid:
+        _registry_stats["reuses"] += 1
+        return registry
+
+    with _registry_lock:
+        if _registry is None or _registry_pid != pid:
+            # fresh process (or forked child): never reuse the parent's sockets
+            reset_shared_clients()
+            _registry = _build_registry()
+            _registry_pid = pid
+            _registry_stats["builds"] += 1
+        else:
+            _registry_stats["reuses"] += 1
+        return _registry
+
+
+def reset_registry():
+    """Drops the cached registry and pooled clients; called after a worker fork."""
+    global _registry, _registry_pid
+    with _registry_lock:
+        _registry = None
+        _registry_pid = None
+        reset_shared_clients()
+        reset_resilience_state()
+
+
+def registry_metrics() -> dict:
+    return {
+        "pid": os.getpid(),
+        "builds": _registry_stats["builds"],
+        "reuses": _registry_stats["reuses"],
+        "connections": connection_metrics(),
+        "resilience": resilience_metrics(),
+        "response_cache": response_cache_metrics(),
+        "ai_calls": ai_call_metrics(),
+    }
+
+
+# Which route produced an evidence's classification/extraction; part of the AI result cache identity
+MULTIMODAL_PATH = "multimodal"  # file sent to the classifier/extractor (or the combined plugin)
+MRZ_PATH = "mrz"  # local MRZ fast path, never cached
+HYBRID_PATH = "hybrid"  # OCR (and translated) text sent to the text classifier/extractor
+
+
+def combined_plugin(registry: AIRegistry):
+    """The classify + extract plugin when combined mode is selected and available."""
+    if settings.ai_pipeline_mode == "combined":
+        return registry.combined
+    return None
+
+
+def hybrid_mode(registry: AIRegistry) -> bool:
+    """True when the OCR-first text path is selected and the registry has an OCR slot."""
+    return settings.ai_pipeline_mode == "hybrid" and registry.ocr is not None
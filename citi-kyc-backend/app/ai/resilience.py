@@ -0,0 +1,286 @@
+from __future__ import annotations
+import asyncio
+import inspect
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+import openai
+from pydantic import ValidationError
+
+from app.ai.instrumentation import ai_call_tags, record_served_by
+from app.ai.rate_limit import is_throttled
+from app.core.config import settings
+
+
+class ProviderUnavailableError(RuntimeError):
+    """Every provider for a call is behind an open circuit breaker."""
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Errors worth retrying: timeouts, connection drops, 408/429/5xx and unparseable replies."""
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError, ValidationError)):
+        return True
+    if isinstance(exc, (httpx.TransportError, openai.APIConnectionError)):
+        return True
+    if is_throttled(exc):
+        return True
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    return isinstance(status, int) and (status == 408 or status >= 500)
+
+
+def is_provider_failure(exc: BaseException) -> bool:
+    """
+    Errors that say the provider itself is unhealthy and count toward its circuit
+    breaker: transient transport/5xx/429 errors and rejected credentials. Errors
+    caused by the document or our own I/O (S3, parsing, malformed replies) do not.
+    """
+    if isinstance(exc, ValidationError):
+        return False
+    if is_transient(exc):
+        return True
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    return status in (401, 403)
+
+
+def provider_name(plugin) -> str:
+    client = getattr(plugin, "client", None)
+    return getattr(client, "provider", None) or type(plugin).__name__
+
+
+def plugin_identity(plugin) -> tuple[str, str, str]:
+    """(provider, model, prompt_version) of a concrete plugin; what its results are cached under."""
+    client = getattr(plugin, "client", None)
+    model = getattr(client, "model", None) or ""
+    return provider_name(plugin), model, getattr(plugin, "prompt_version", "v1")
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed calls and rejects calls for
+    `reset_seconds`; then lets a single probe through (half-open) and closes again
+    on its success.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        if self.opened_at is None:
+            return True
+        if not self._probing and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release_probe(self):
+        """The half-open probe ended without a verdict (cancelled, or failed on our side)."""
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Rolling window of successful call durations, used as the hedging threshold."""
+
+    def __init__(self, window: int = 200):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def quantile(self, q: float, min_samples: int) -> Optional[float]:
+        if len(self.samples) < min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# Shared per provider (and per provider/method for latency) across all registry slots
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[tuple, LatencyTracker] = {}
+_state_lock = threading.Lock()
+
+
+def breaker_for(provider: str) -> CircuitBreaker:
+    with _state_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = CircuitBreaker(settings.ai_circuit_failure_threshold, settings.ai_circuit_reset_seconds)
+            _breakers[provider] = breaker
+        return breaker
+
+
+def latency_for(provider: str, method: str) -> LatencyTracker:
+    with _state_lock:
+        tracker = _latencies.get((provider, method))
+        if tracker is None:
+            tracker = LatencyTracker()
+            _latencies[(provider, method)] = tracker
+        return tracker
+
+
+def reset_resilience_state():
+    with _state_lock:
+        _breakers.clear()
+        _latencies.clear()
+
+
+def resilience_metrics() -> dict:
+    return {
+        "breakers": {
+            name: {"open": b.is_open, "consecutive_failures": b.failures}
+            for name, b in _breakers.items()
+        },
+        "p95_seconds": {
+            f"{provider}.{method}": t.quantile(0.95, 1)
+            for (provider, method), t in _latencies.items()
+        },
+    }
+
+
+class ResilientPlugin:
+    """
+    Wraps a primary plugin (and optionally the same slot from a secondary provider).
+
+    Every async method of the primary is exposed unchanged, but each call gets:
+    - a per-attempt timeout (`ai_call_timeout_seconds`)
+    - retries with full-jitter exponential backoff on transient errors
+    - optional hedging: a duplicate request once the call outlives the observed
+      latency quantile, first valid reply wins
+    - fallback to the secondary when the primary fails or its circuit is open
+    Non-async attributes (client, prompt_version, ...) come from the primary; the
+    plugin that actually answered is reported through `record_served_by`.
+    """
+
+    def __init__(self, primary, secondary=None):
+        self.primary = primary
+        self.secondary = secondary
+
+    def __getattr__(self, name: str):
+        if name in ("primary", "secondary"):
+            raise AttributeError(name)
+        attr = getattr(self.primary, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await self._call(name, args, kwargs)
+
+        return call
+
+    def _candidates(self, method: str) -> list:
+        return [p for p in (self.primary, self.secondary) if p is not None and hasattr(p, method)]
+
+    async def _call(self, method: str, args: tuple, kwargs: dict) -> Any:
+        last_exc: Optional[BaseException] = None
+        for plugin in self._candidates(method):
+            provider = provider_name(plugin)
+            breaker = breaker_for(provider)
+            if not breaker.allow():
+                print(f"AI {provider}.{method}: circuit open, skipping")
+                continue
+            try:
+                served, result = await self._with_retries(plugin, method, args, kwargs)
+            except Exception as e:
+                if not is_provider_failure(e):
+                    # bad document, S3 or parse error: not the provider's fault, and a fallback would fail alike
+                    breaker.release_probe()
+                    raise
+                breaker.record_failure()
+                last_exc = e
+                print(f"AI {provider}.{method} failed: {type(e).__name__}: {e}")
+                continue
+            except BaseException:
+                # cancelled (speculative work discarded, sibling evidence failed): no verdict
+                breaker.release_probe()
+                raise
+            breaker.record_success()
+            record_served_by(method, plugin_identity(served))
+            return result
+
+        if last_exc is not None:
+            raise last_exc
+        raise ProviderUnavailableError(f"No AI provider available for {method}")
+
+    async def _with_retries(self, plugin, method: str, args: tuple, kwargs: dict) -> tuple[Any, Any]:
+        attempts = settings.ai_retry_attempts + 1
+        for attempt in range(attempts):
+            try:
+                with ai_call_tags(attempt=attempt):
+                    return await asyncio.wait_for(
+                        self._hedged(plugin, method, args, kwargs),
+                        timeout=settings.ai_call_timeout_seconds,
+                    )
+            except Exception as e:
+                if attempt == attempts - 1 or not is_transient(e):
+                    raise
+                delay = random.uniform(0, settings.ai_retry_base_delay_seconds * 2 ** attempt)
+                print(f"AI {provider_name(plugin)}.{method} attempt {attempt + 1} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _timed(self, plugin, method: str, args: tuple, kwargs: dict) -> tuple[Any, Any]:
+        """(plugin, result): a hedge may be answered by a different plugin than the one called."""
+        start = time.monotonic()
+        result = await getattr(plugin, method)(*args, **kwargs)
+        latency_for(provider_name(plugin), method).record(time.monotonic() - start)
+        return plugin, result
+
+    def _hedge_target(self, plugin, method: str):
+        other = self.secondary if plugin is self.primary else self.primary
+        if other is not None and hasattr(other, method) and not breaker_for(provider_name(other)).is_open:
+            return other
+        return plugin
+
+    async def _hedged(self, plugin, method: str, args: tuple, kwargs: dict) -> tuple[Any, Any]:
+        threshold = None
+        if settings.ai_hedging_enabled:
+            threshold = latency_for(provider_name(plugin), method).quantile(
+                settings.ai_hedge_quantile, settings.ai_hedge_min_samples
+            )
+        if threshold is None:
+            return await self._timed(plugin, method, args, kwargs)
+
+        first = asyncio.ensure_future(self._timed(plugin, method, args, kwargs))
+        pending = {first}
+        error: Optional[BaseException] = None
+        try:
+            done, _ = await asyncio.wait(pending, timeout=threshold)
+            if done:
+                return first.result()
+
+            hedge_plugin = self._hedge_target(plugin, method)
+            print(f"AI {provider_name(plugin)}.{method} over p{int(settings.ai_hedge_quantile * 100)} ({threshold:.2f}s), hedging on {provider_name(hedge_plugin)}")
+            # tagged so response dedupe does not fold it into the request it is racing
+            with ai_call_tags(hedge=True):
+                pending.add(asyncio.ensure_future(self._timed(hedge_plugin, method, args, kwargs)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
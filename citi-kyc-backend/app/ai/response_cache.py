@@ -0,0 +1,235 @@
+from __future__ import annotations
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from app.ai.instrumentation import ai_call_tag
+from app.ai.schema_registry import compiled_schema
+from app.core.config import settings
+
+OFF = "off"
+DEDUPE = "dedupe"  # serve identical requests from the store, call the provider on a miss
+RECORD = "record"  # always call the provider and (re)write the stored response
+REPLAY = "replay"  # never call the provider; a miss is an error
+
+
+class ResponseCacheMiss(RuntimeError):
+    """Replay mode found no recorded response for a request."""
+
+
+def request_key(client, arguments: dict) -> str:
+    """Hash of everything that determines a structured response."""
+    file_bytes = arguments.get("file_bytes")
+    schema = compiled_schema(arguments["schema_model"])
+    raw = json.dumps(
+        [
+            getattr(client, "provider", type(client).__name__),
+            client.model,
+            arguments.get("system_prompt"),
+            arguments["prompt"],
+            schema.fingerprint,
+            hashlib.sha256(file_bytes).hexdigest() if file_bytes else None,
+            arguments.get("mime_type") if file_bytes else None,
+            arguments.get("temperature"),
+            arguments.get("max_output_tokens"),
+        ],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite store of validated structured responses, LRU-evicted beyond
+    `max_entries`. WAL mode lets every worker process share one file.
+    """
+
+    _EVICT_EVERY = 100
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_responses_last_used ON llm_responses (last_used_at)")
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE llm_responses SET last_used_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, model: str, response: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO llm_responses (key, model, response, created_at, last_used_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET response = excluded.response, last_used_at = excluded.last_used_at",
+                (key, model, response, now, now),
+            )
+            self._puts += 1
+            if self._puts % self._EVICT_EVERY == 0:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM llm_responses WHERE key IN "
+                "(SELECT key FROM llm_responses ORDER BY last_used_at ASC LIMIT ?)",
+                (overflow,),
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache: ResponseCache | None = None
+_cache_pid: int | None = None
+_cache_lock = threading.Lock()
+
+
+class _InFlight:
+    """A provider call shared by identical concurrent requests, and how many callers await it."""
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+_inflight: Dict[str, _InFlight] = {}
+
+
+def get_response_cache() -> ResponseCache:
+    global _cache, _cache_pid
+    with _cache_lock:
+        # sqlite connections must not cross a fork
+        if _cache is None or _cache_pid != os.getpid():
+            _cache = ResponseCache(settings.ai_response_cache_path, settings.ai_response_cache_max_entries)
+            _cache_pid = os.getpid()
+        return _cache
+
+
+def response_cache_metrics() -> dict:
+    if _cache is None:
+        return {"mode": settings.ai_response_cache_mode}
+    return {"mode": settings.ai_response_cache_mode, "hits": _cache.hits, "misses": _cache.misses}
+
+
+def cached_response(fn):
+    """
+    Wraps a client's generate_structured / agenerate_structured with the
+    response store selected by `ai_response_cache_mode`. In dedupe mode,
+    identical concurrent requests also share a single provider call, which is
+    cancelled when the last caller waiting for it is cancelled. Hedge attempts
+    (tagged hedge=True) always make their own call, since joining the slow
+    request they race would defeat the hedge.
+    """
+    signature = inspect.signature(fn)
+
+    def _prepare(self, args, kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        return request_key(self, bound.arguments), bound.arguments["schema_model"]
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(self, *args, **kwargs):
+            mode = settings.ai_response_cache_mode
+            if mode == OFF:
+                return await fn(self, *args, **kwargs)
+
+            key, schema_model = _prepare(self, args, kwargs)
+            cache = get_response_cache()
+            if mode != RECORD:
+                hit = await asyncio.to_thread(cache.get, key)
+                if hit is not None:
+                    return compiled_schema(schema_model).parse(hit)
+                if mode == REPLAY:
+                    raise ResponseCacheMiss(f"No recorded {self.model} response for request {key}")
+
+            async def call_and_store() -> str:
+                result = await fn(self, *args, **kwargs)
+                text = result.model_dump_json()
+                await asyncio.to_thread(cache.put, key, self.model, text)
+                return text
+
+            dedupe = mode == DEDUPE and not ai_call_tag("hedge")
+            entry = _inflight.get(key) if dedupe else None
+            if entry is None:
+                entry = _InFlight(asyncio.ensure_future(call_and_store()))
+                if dedupe:
+                    _inflight[key] = entry
+                    entry.task.add_done_callback(lambda _: _inflight.pop(key, None) if _inflight.get(key) is entry else None)
+
+            # the shield keeps one caller's cancellation from failing the others;
+            # the call itself is cancelled once nobody is waiting for it
+            entry.waiters += 1
+            try:
+                text = await asyncio.shield(entry.task)
+            finally:
+                entry.waiters -= 1
+                if entry.waiters == 0 and not entry.task.done():
+                    if _inflight.get(key) is entry:
+                        del _inflight[key]  # later callers start a fresh call
+                    entry.task.cancel()
+            return compiled_schema(schema_model).parse(text)
+
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        mode = settings.ai_response_cache_mode
+        if mode == OFF:
+            return fn(self, *args, **kwargs)
+
+        key, schema_model = _prepare(self, args, kwargs)
+        cache = get_response_cache()
+        if mode != RECORD:
+            hit = cache.get(key)
+            if hit is not None:
+                return compiled_schema(schema_model).parse(hit)
+            if mode == REPLAY:
+                raise ResponseCacheMiss(f"No recorded {self.model} response for request {key}")
+
+        result = fn(self, *args, **kwargs)
+        cache.put(key, self.model, result.model_dump_json())
+        return result
+
+    return wrapper
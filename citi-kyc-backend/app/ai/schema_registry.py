@@ -0,0 +1,52 @@
+from __future__ import annotations
+import copy
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from pydantic import TypeAdapter
+
+
+@dataclass(frozen=True)
+class CompiledSchema:
+    """
+    Response schema for one structured-output model, built once per process:
+    the JSON schema sent to providers, a prebuilt validator for replies and a
+    stable fingerprint used in response cache keys.
+    """
+    model: type
+    json_schema: Dict[str, Any]
+    adapter: TypeAdapter
+    fingerprint: str
+
+    def provider_schema(self) -> Dict[str, Any]:
+        # the Gemini SDK rewrites the schema dict in place, so every request gets its own copy
+        return copy.deepcopy(self.json_schema)
+
+    def parse(self, text: str | bytes) -> Any:
+        return self.adapter.validate_json(text)
+
+
+_compiled: Dict[type, CompiledSchema] = {}
+_lock = threading.Lock()
+
+
+def compiled_schema(model: type) -> CompiledSchema:
+    compiled = _compiled.get(model)
+    if compiled is not None:
+        return compiled
+    with _lock:
+        compiled = _compiled.get(model)
+        if compiled is None:
+            json_schema = model.model_json_schema()
+            canonical = json.dumps(json_schema, sort_keys=True, separators=(",", ":"))
+            compiled = CompiledSchema(
+                model=model,
+                json_schema=json_schema,
+                adapter=TypeAdapter(model),
+                fingerprint=hashlib.sha256(canonical.encode("utf-8")).hexdigest(),
+            )
+            _compiled[model] = compiled
+        return compiled
@@ -0,0 +1,147 @@
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.ai.contracts.outputs import FieldValue
+
+# Local implementation of the normalization rules in REASONER_SYSTEM_PROMPT.
+# Fields that match under these rules never need the LLM reasoner.
+
+HONORIFICS = {"MR", "MRS", "MS", "MISS", "DR", "SHRI", "SHREE", "SMT", "KUMARI"}
+
+COUNTRY_FIELDS = {"citizenship", "issuing_country", "address.country"}
+COUNTRY_ALIASES = {
+    "REPUBLICOFINDIA": "INDIA",
+    "BHARAT": "INDIA",
+    "IND": "INDIA",
+    "IN": "INDIA",
+    "INDIAN": "INDIA",
+    "UNITEDSTATESOFAMERICA": "USA",
+    "UNITEDSTATES": "USA",
+    "US": "USA",
+    "AMERICAN": "USA",
+    "UNITEDKINGDOM": "GBR",
+    "GREATBRITAIN": "GBR",
+    "UK": "GBR",
+    "GB": "GBR",
+    "BRITISH": "GBR",
+}
+
+LOCATION_FIELDS = ("address.city", "address.state")
+
+_TOKEN_RE = re.compile(r"[A-Z0-9]+")
+_ISO_DATE_RE = re.compile(r"^\s*(\d{4})-(\d{1,2})-(\d{1,2})")
+
+
+def normalize_value(field_name: str, value: Any) -> Optional[str]:
+    """
+    Uppercase, drop whitespace/punctuation, strip leading honorifics from names and
+    fold known country spellings. Returns None for missing/empty values.
+    """
+    if value is None:
+        return None
+    text = str(value)
+
+    m = _ISO_DATE_RE.match(text)
+    if m:
+        y, mo, d = m.groups()
+        return f"{y}{int(mo):02d}{int(d):02d}"
+
+    tokens = _TOKEN_RE.findall(text.upper())
+    if field_name.endswith("name"):
+        while len(tokens) > 1 and tokens[0] in HONORIFICS:
+            tokens = tokens[1:]
+
+    normalized = "".join(tokens)
+    if not normalized:
+        return None
+    if field_name in COUNTRY_FIELDS:
+        normalized = COUNTRY_ALIASES.get(normalized, normalized)
+    return normalized
+
+
+def _lookup(source: Dict[str, Any], path: str) -> Any:
+    if not source:
+        return None
+    if path in source:
+        return source[path]
+    node: Any = source
+    for part in path.split("."):
+        if not isinstance(node, dict) or part not in node:
+            return None
+        node = node[part]
+    return node
+
+
+@dataclass
+class FieldComparison:
+    matched: List[str] = field(default_factory=list)
+    ambiguous: List[str] = field(default_factory=list)
+    reasons: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def all_match(self) -> bool:
+        return not self.ambiguous
+
+
+def compare_fields(
+    extraction_fields: List[str],
+    profile: Dict[str, Any],
+    payload: Dict[str, Any],
+    evidence_fields: List[Dict[str, FieldValue]],
+    min_confidence: float,
+) -> FieldComparison:
+    """
+    Splits `extraction_fields` into fields that match exactly after normalization
+    (at `min_confidence` or above) and ambiguous ones that still need the reasoner.
+    Fields absent from both profile and payload have nothing to conflict with and
+    count as matched.
+    """
+    result = FieldComparison()
+
+    def refs(name: str) -> List[str]:
+        values = [normalize_value(name, _lookup(profile, name)), normalize_value(name, _lookup(payload, name))]
+        return [v for v in values if v is not None]
+
+    def observed(name: str) -> List[FieldValue]:
+        return [f[name] for f in evidence_fields if name in f and normalize_value(name, f[name].value) is not None]
+
+    for name in extraction_fields:
+        expected = refs(name)
+        if not expected:
+            result.matched.append(name)
+            continue
+
+        if len(set(expected)) > 1:
+            result.ambiguous.append(name)
+            result.reasons[name] = "profile and payload differ"
+            continue
+
+        seen = observed(name)
+        if name in LOCATION_FIELDS:
+            # document may carry only the city or only the state; either may match either
+            accepted = {v for loc in LOCATION_FIELDS for v in refs(loc)}
+            if not seen:
+                seen = [fv for loc in LOCATION_FIELDS for fv in observed(loc)]
+        else:
+            accepted = set(expected)
+
+        if not seen:
+            result.ambiguous.append(name)
+            result.reasons[name] = "not found in evidence"
+            continue
+
+        low = [fv for fv in seen if fv.confidence.value < min_confidence]
+        if low:
+            result.ambiguous.append(name)
+            result.reasons[name] = "low extraction confidence"
+            continue
+
+        if all(normalize_value(name, fv.value) in accepted for fv in seen):
+            result.matched.append(name)
+        else:
+            result.ambiguous.append(name)
+            result.reasons[name] = "value mismatch"
+
+    return result
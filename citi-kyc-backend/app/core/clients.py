@@ -0,0 +1,124 @@
+from __future__ import annotations
+import os
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict
+
+import boto3
+import httpx
+from botocore.config import Config as BotoConfig
+
+from app.core.config import settings
+
+
+@dataclass
+class ConnectionStats:
+    """
+    Request vs. new-connection counters for one pooled HTTP client
+    """
+    requests: int = 0
+    new_connections: int = 0
+    _streams: "weakref.WeakSet" = field(default_factory=weakref.WeakSet, repr=False)
+
+    def observe(self, response: httpx.Response):
+        self.requests += 1
+        stream = response.extensions.get("network_stream")
+        if stream is None:
+            return
+        try:
+            if stream not in self._streams:
+                self._streams.add(stream)
+                self.new_connections += 1
+        except TypeError:
+            # stream type is not weak-referenceable; only requests are counted
+            pass
+
+    @property
+    def reused(self) -> int:
+        return max(0, self.requests - self.new_connections)
+
+
+_lock = threading.Lock()
+_pid: int | None = None
+_s3_client = None
+_connection_stats: Dict[str, ConnectionStats] = {}
+
+
+def _check_pid():
+    """Drops clients inherited from a parent process (e.g. after a Celery fork)."""
+    global _pid, _s3_client
+    pid = os.getpid()
+    if _pid != pid:
+        _pid = pid
+        _s3_client = None
+        _connection_stats.clear()
+
+
+def reset_shared_clients():
+    global _pid
+    with _lock:
+        _pid = None
+        _check_pid()
+
+
+def shared_s3_client():
+    """
+    One boto3 S3 client per process; boto3 clients are thread-safe and keep
+    their own urllib3 connection pool.
+    """
+    global _s3_client
+    with _lock:
+        _check_pid()
+        if _s3_client is None:
+            _s3_client = boto3.client(
+                "s3",
+                region_name=settings.s3_region,
+                config=BotoConfig(max_pool_connections=settings.s3_max_pool_connections),
+            )
+        return _s3_client
+
+
+def _stats(name: str) -> ConnectionStats:
+    with _lock:
+        _check_pid()
+        return _connection_stats.setdefault(name, ConnectionStats())
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.ai_http_max_connections,
+        max_keepalive_connections=settings.ai_http_max_keepalive_connections,
+        keepalive_expiry=settings.ai_http_keepalive_expiry_seconds,
+    )
+
+
+def pooled_http_client(name: str) -> httpx.Client:
+    stats = _stats(name)
+    return httpx.Client(
+        limits=_limits(),
+        timeout=httpx.Timeout(settings.ai_http_timeout_seconds),
+        event_hooks={"response": [stats.observe]},
+    )
+
+
+def pooled_async_http_client(name: str) -> httpx.AsyncClient:
+    stats = _stats(name)
+
+    async def _observe(response: httpx.Response):
+        stats.observe(response)
+
+    return httpx.AsyncClient(
+        limits=_limits(),
+        timeout=httpx.Timeout(settings.ai_http_timeout_seconds),
+        event_hooks={"response": [_observe]},
+    )
+
+
+def connection_metrics() -> dict:
+    with _lock:
+        _check_pid()
+        return {
+            name: {"requests": s.requests, "new_connections": s.new_connections, "reused": s.reused}
+            for name, s in _connection_stats.items()
+        }
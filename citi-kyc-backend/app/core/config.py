@@ -22,6 +22,96 @@ class Settings(BaseSettings):
     use_gemini_plugins: bool = False
     gemini_model: str | None = None
 
+    # Validation pipeline
+    ai_pipeline_mode: str = "separate"  # separate | combined (one classify+extract call per document) | hybrid (OCR first)
+    hybrid_min_ocr_confidence: float = 0.75  # below this, hybrid mode sends the file to the multimodal path
+    hybrid_min_ocr_chars: int = 20
+    evidence_concurrency_per_case: int = 4  # 1 = process evidence one by one
+    evidence_concurrency_per_worker: int = 16
+    speculative_extraction: bool = True  # start extraction alongside classification
+    worker_max_concurrent_validations: int = 8  # cases in flight on one worker's event loop
+    discrepancy_write_mode: str = "reconcile"  # reconcile | replace
+
+    # Deterministic comparator; cases where every field matches skip the LLM reasoner
+    comparator_enabled: bool = True
+    comparator_min_confidence: float = 0.9
+    evidence_blob_max_inline_bytes: int = 8 * 1024 * 1024  # larger objects spill to a temp file
+    evidence_blob_max_object_bytes: int = 50 * 1024 * 1024
+    evidence_blob_memory_budget_bytes: int = 64 * 1024 * 1024  # per validation run
+
+    # Evidence preparation before inline upload to multimodal LLMs
+    llm_upload_prep_enabled: bool = True
+    llm_image_max_long_edge: int = 2048  # px; larger photos are downsampled and re-encoded as JPEG
+    llm_image_jpeg_quality: int = 85
+    llm_pdf_max_pages: int = 4  # first page plus KYC-looking pages (needs pypdf)
+    openai_image_detail: str = "auto"  # low | high | auto
+    openai_file_upload_min_bytes: int = 4 * 1024 * 1024  # larger PDFs go through the Files API
+
+    # Local MRZ fast path: a check-digit-valid MRZ replaces the LLM classifier/extractor
+    mrz_fast_path_enabled: bool = True
+    mrz_fast_path_categories: list = ["cip"]
+    mrz_tesseract_lang: str = "eng"  # "ocrb" when the traineddata is installed
+    mrz_confidence: float = 0.99
+
+    # Local OCR: pages are rasterized and recognized in parallel worker processes
+    ocr_provider: str = "tesseract"  # tesseract (subprocess per page) | tesserocr (warm in-process handles)
+    ocr_executor: str = "process"  # process | thread (forced when the worker cannot fork children)
+    ocr_max_workers: int = 0  # 0 = one per CPU
+    ocr_tesseract_lang: str = "eng"
+    ocr_pdf_dpi: int = 300  # PDF rasterization needs pypdfium2
+    ocr_max_pages: int = 50
+    ocr_preprocess_enabled: bool = True  # grayscale/binarize/deskew/crop before Tesseract (needs numpy)
+    ocr_target_dpi: int = 300
+    ocr_max_skew_degrees: float = 5.0
+
+    # Pooled clients (one set per worker process)
+    s3_max_pool_connections: int = 32
+    ai_http_max_connections: int = 64
+    ai_http_max_keepalive_connections: int = 32
+    ai_http_keepalive_expiry_seconds: float = 60.0
+    ai_http_timeout_seconds: float = 120.0
+
+    # AI result cache (classification / extraction keyed by evidence sha256)
+    ai_result_cache_enabled: bool = True
+    ai_result_cache_ttl_seconds: int = 30 * 24 * 3600
+    ai_result_cache_max_entries: int = 100_000
+    incremental_validation_enabled: bool = True  # keep per-case results so resolve_case re-runs only changed evidence
+
+    # Provider rate limits, keyed by "provider:model" or "provider", e.g.
+    # {"gemini:gemini-2.0-flash": {"rpm": 1000, "tpm": 4000000}}
+    ai_rate_limit_enabled: bool = True
+    ai_rate_limit_redis_url: str | None = None  # shared buckets across workers; local buckets when unset
+    ai_rate_limits: dict = {}
+    ai_max_concurrency: int = 32  # per provider/model per worker; AIMD backs off on 429s
+    ai_min_concurrency: int = 1
+
+    # Resilience around provider calls (AI_FALLBACK_PROVIDER selects the secondary provider)
+    ai_resilience_enabled: bool = True
+    ai_call_timeout_seconds: float = 90.0  # per attempt
+    ai_retry_attempts: int = 2  # retries after the first attempt, transient errors only
+    ai_retry_base_delay_seconds: float = 0.5
+    ai_hedging_enabled: bool = False
+    ai_hedge_quantile: float = 0.95
+    ai_hedge_min_samples: int = 20
+    ai_circuit_failure_threshold: int = 5
+    ai_circuit_reset_seconds: float = 30.0
+
+    # Static system prompts go first so provider prefix caching applies (plus OpenAI prompt_cache_key routing)
+    ai_prompt_cache_enabled: bool = True
+
+    # Local LLM response store: off | dedupe | record | replay (offline load tests)
+    ai_response_cache_mode: str = "off"
+    ai_response_cache_path: str = ".cache/llm_responses.sqlite3"
+    ai_response_cache_max_entries: int = 50_000
+
+    # Per-call AI telemetry; prices are USD per million tokens
+    ai_call_log_enabled: bool = True
+    ai_call_audit_enabled: bool = True  # AI_INVOCATION audit events, written once per validation run
+    ai_model_prices: dict = {
+        "gemini-2.0-flash": {"input": 0.10, "cached_input": 0.025, "output": 0.40},
+        "gpt-4.1": {"input": 2.00, "cached_input": 0.50, "output": 8.00},
+    }
+
     # Customer profile service (adapter)
     customer_profile_base_url: str = "http://customer-profile-service:8080"
 
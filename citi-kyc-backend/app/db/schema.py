@@ -0,0 +1,32 @@
+from sqlalchemy import Table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import Base
+
+# tables this process has already created or found, keyed by database URL
+_ensured: set = set()
+
+
+async def ensure_table(table: Table, db: AsyncSession):
+    """
+    Creates `table` (and its indexes) on first use if it does not exist yet.
+    Runs on its own connection, so the DDL commits even if the caller's
+    transaction is rolled back.
+    """
+    engine = db.bind
+    key = (str(engine.url), table.name)
+    if key in _ensured:
+        return
+
+    def create(conn):
+        Base.metadata.create_all(conn, tables=[table], checkfirst=True)
+
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(create)
+    except Exception:
+        # another worker created it between our check and CREATE TABLE
+        async with engine.begin() as conn:
+            await conn.run_sync(create)
+    print(f"Table {table.name} ready")
+    _ensured.add(key)
@@ -0,0 +1,24 @@
+from sqlalchemy import String, DateTime, Integer, JSON, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class AIResultCacheEntry(Base):
+    __tablename__ = "ai_result_cache"
+
+    # sha256 of (kind, evidence sha256, provider, model, prompt version, sorted extraction fields)
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(30), nullable=False)  # classification/extraction
+
+    evidence_sha256: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
+    provider: Mapped[str] = mapped_column(String(50), nullable=False)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String(50), nullable=False)
+
+    # DocumentClassificationResult / ExtractedFields dump
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    hits: Mapped[int] = mapped_column(Integer, default=0)
+
+    created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    last_accessed_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+    expires_at: Mapped[str] = mapped_column(DateTime(timezone=True), index=True, nullable=False)
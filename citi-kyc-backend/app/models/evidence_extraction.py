@@ -0,0 +1,20 @@
+from sqlalchemy import String, DateTime, JSON, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class EvidenceExtraction(Base):
+    __tablename__ = "evidence_extractions"
+
+    # latest AI pipeline result for an evidence, reused by incremental re-validation
+    evidence_id: Mapped[str] = mapped_column(String(50), primary_key=True)
+    case_id: Mapped[str] = mapped_column(String(50), index=True, nullable=False)
+
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False)
+    fields_fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)  # sha256 of sorted extraction_fields
+
+    doc_type: Mapped[dict] = mapped_column(JSON, nullable=False)
+    fields: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,227 @@
+from __future__ import annotations
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.schema import ensure_table
+from app.ai.contracts.inputs import EvidenceInput
+from app.ai.contracts.outputs import DocumentClassificationResult, ExtractedFields
+from app.ai.registry import HYBRID_PATH, MRZ_PATH, MULTIMODAL_PATH, combined_plugin, hybrid_mode
+from app.ai.resilience import plugin_identity
+from app.models.ai_result_cache import AIResultCacheEntry
+
+CLASSIFICATION = "classification"
+EXTRACTION = "extraction"
+
+
+@dataclass(frozen=True)
+class CachedEvidenceResult:
+    doc_type: Optional[DocumentClassificationResult] = None
+    fields: Optional[ExtractedFields] = None
+
+
+# plugin methods whose result fills each kind, per pipeline path
+_TEXT_METHODS = {CLASSIFICATION: "classify_text", EXTRACTION: "extract_from_text"}
+_FILE_METHODS = {CLASSIFICATION: "classify", EXTRACTION: "extract_from_evidence"}
+_COMBINED_METHOD = "classify_and_extract"
+
+
+def _served_identity(outcome, kind: str, default: tuple) -> tuple:
+    """Identity of the plugin that produced this result; a fallback or hedge provider differs from the primary."""
+    served = outcome.served_by
+    if outcome.path == HYBRID_PATH:
+        method = _TEXT_METHODS[kind]
+    elif _COMBINED_METHOD in served:
+        method = _COMBINED_METHOD
+    else:
+        method = _FILE_METHODS[kind]
+    return served.get(method, default)
+
+
+def _plugins(registry) -> tuple:
+    # in combined mode both results come from the classify + extract plugin
+    combined = combined_plugin(registry)
+    if combined is not None:
+        return combined, combined
+    return registry.classifier, registry.extractor
+
+
+def _paths(registry) -> List[str]:
+    # hybrid mode can also be served the multimodal results of its low-OCR fallbacks
+    if hybrid_mode(registry):
+        return [HYBRID_PATH, MULTIMODAL_PATH]
+    return [MULTIMODAL_PATH]
+
+
+def cache_key(
+    kind: str,
+    sha256: str,
+    provider: str,
+    model: str,
+    prompt_version: str,
+    fields: List[str] | None = None,
+    path: str = MULTIMODAL_PATH,
+) -> str:
+    raw = json.dumps(
+        [kind, sha256, provider, model, prompt_version, sorted(fields or []), path],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AIResultCacheService:
+    """
+    Content-addressed cache of classifier / extractor results.
+
+    Entries are keyed by the evidence sha256 captured at confirm_upload plus the
+    provider, model, prompt version (of the provider that actually answered), pipeline path (file vs OCR text) and (for
+    extraction) the sorted field list, so unchanged documents skip the LLM on
+    re-validation. Evidence without a sha256 is never cached. The table is
+    created on first use.
+    """
+
+    _EVICT_EVERY = 500
+    _inserted = 0  # rows stored by this process since the last eviction
+
+    def _keys(self, registry, evidences: List[EvidenceInput], extraction_fields: List[str]) -> Dict[str, list]:
+        keys: Dict[str, list] = {}
+        cls_plugin, ext_plugin = _plugins(registry)
+        cls_id = plugin_identity(cls_plugin)
+        ext_id = plugin_identity(ext_plugin)
+        for ev in evidences:
+            if not ev.sha256:
+                continue
+            for rank, path in enumerate(_paths(registry)):
+                keys.setdefault(cache_key(CLASSIFICATION, ev.sha256, *cls_id, path=path), []).append((ev.evidence_id, "doc_type", rank))
+                keys.setdefault(cache_key(EXTRACTION, ev.sha256, *ext_id, extraction_fields, path), []).append((ev.evidence_id, "fields", rank))
+        return keys
+
+    async def lookup(
+        self,
+        registry,
+        evidences: List[EvidenceInput],
+        extraction_fields: List[str],
+        db: AsyncSession,
+    ) -> Dict[str, CachedEvidenceResult]:
+        if not settings.ai_result_cache_enabled:
+            return {}
+
+        keys = self._keys(registry, evidences, extraction_fields)
+        if not keys:
+            return {}
+        await ensure_table(AIResultCacheEntry.__table__, db)
+
+        now = datetime.now(timezone.utc)
+        q = await db.execute(
+            select(AIResultCacheEntry).where(
+                AIResultCacheEntry.cache_key.in_(list(keys)),
+                AIResultCacheEntry.expires_at > now,
+            )
+        )
+
+        found: Dict[str, dict] = {}
+        ranks: Dict[tuple, int] = {}
+        for row in q.scalars().all():
+            row.hits = (row.hits or 0) + 1
+            row.last_accessed_at = now
+            for evidence_id, slot, rank in keys[row.cache_key]:
+                # the current mode's own path wins over a fallback path's result
+                if ranks.get((evidence_id, slot), len(keys)) > rank:
+                    ranks[(evidence_id, slot)] = rank
+                    found.setdefault(evidence_id, {})[slot] = row.payload
+
+        print(f"AI result cache: {sum(len(v) for v in found.values())} hits for {len(evidences)} evidences")
+        return {
+            evidence_id: CachedEvidenceResult(
+                doc_type=DocumentClassificationResult.model_validate(slots["doc_type"]) if "doc_type" in slots else None,
+                fields=ExtractedFields.model_validate(slots["fields"]) if "fields" in slots else None,
+            )
+            for evidence_id, slots in found.items()
+        }
+
+    async def store(self, registry, outcomes, extraction_fields: List[str], db: AsyncSession):
+        """
+        Adds freshly computed results from pipeline outcomes to the session; they
+        are committed with the run's case update. Every `_EVICT_EVERY` inserted
+        rows (per process), expired and least-recently-used entries beyond the
+        configured size are evicted as well.
+        """
+        if not settings.ai_result_cache_enabled:
+            return
+
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=settings.ai_result_cache_ttl_seconds)
+        cls_plugin, ext_plugin = _plugins(registry)
+        cls_id = plugin_identity(cls_plugin)
+        ext_id = plugin_identity(ext_plugin)
+
+        rows: Dict[str, dict] = {}
+        for o in outcomes:
+            sha256 = o.evidence.sha256
+            # MRZ reads are cheap to redo and must not be served as LLM results
+            if not sha256 or o.path == MRZ_PATH:
+                continue
+            if o.doc_type is not None and not o.doc_type_cached:
+                identity = _served_identity(o, CLASSIFICATION, cls_id)
+                key = cache_key(CLASSIFICATION, sha256, *identity, path=o.path)
+                rows[key] = self._row(key, CLASSIFICATION, sha256, identity, o.doc_type.model_dump(), now, expires_at)
+            if o.fields is not None and not o.fields_cached:
+                identity = _served_identity(o, EXTRACTION, ext_id)
+                key = cache_key(EXTRACTION, sha256, *identity, extraction_fields, o.path)
+                rows[key] = self._row(key, EXTRACTION, sha256, identity, o.fields.model_dump(), now, expires_at)
+
+        if rows:
+            await ensure_table(AIResultCacheEntry.__table__, db)
+            stmt = insert(AIResultCacheEntry).values(list(rows.values()))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[AIResultCacheEntry.cache_key],
+                set_={
+                    "payload": stmt.excluded.payload,
+                    "last_accessed_at": stmt.excluded.last_accessed_at,
+                    "expires_at": stmt.excluded.expires_at,
+                },
+            )
+            await db.execute(stmt)
+
+            # count(*) over the whole table is too costly for every validation run
+            AIResultCacheService._inserted += len(rows)
+            if AIResultCacheService._inserted >= self._EVICT_EVERY:
+                AIResultCacheService._inserted = 0
+                await self._evict(now, db)
+
+    @staticmethod
+    def _row(key, kind, sha256, identity, payload, now, expires_at) -> dict:
+        provider, model, prompt_version = identity
+        return {
+            "cache_key": key,
+            "kind": kind,
+            "evidence_sha256": sha256,
+            "provider": provider,
+            "model": model,
+            "prompt_version": prompt_version,
+            "payload": payload,
+            "hits": 0,
+            "created_at": now,
+            "last_accessed_at": now,
+            "expires_at": expires_at,
+        }
+
+    async def _evict(self, now: datetime, db: AsyncSession):
+        await db.execute(delete(AIResultCacheEntry).where(AIResultCacheEntry.expires_at <= now))
+
+        count = (await db.execute(select(func.count()).select_from(AIResultCacheEntry))).scalar_one()
+        overflow = count - settings.ai_result_cache_max_entries
+        if overflow > 0:
+            oldest = (
+                select(AIResultCacheEntry.cache_key)
+                .order_by(AIResultCacheEntry.last_accessed_at.asc())
+                .limit(overflow)
+            )
+            await db.execute(delete(AIResultCacheEntry).where(AIResultCacheEntry.cache_key.in_(oldest)))
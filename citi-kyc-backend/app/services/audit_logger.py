@@ -23,3 +23,26 @@ class AuditLogger:
         )
         db.add(ev)
         await db.commit()
+
+    async def log_many(
+        self,
+        event_type: AuditEventType,
+        payloads: list[dict],
+        db: AsyncSession,
+        case_id: str | None = None,
+        actor_type: str = "SYSTEM",
+        actor_id: str | None = None,
+    ):
+        """Writes a batch of events of one type in a single commit."""
+        db.add_all([
+            AuditEvent(
+                id=f"AUD-{uuid.uuid4().hex[:12].upper()}",
+                case_id=case_id,
+                event_type=event_type,
+                actor_type=actor_type,
+                actor_id=actor_id,
+                payload=payload,
+            )
+            for payload in payloads
+        ])
+        await db.commit()
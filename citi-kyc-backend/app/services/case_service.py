@@ -80,11 +80,11 @@ class CaseService:
                 existing = set(case.evidence_ids or [])
                 case.evidence_ids = list(existing.union(set(payload.additional_evidence_ids)))
 
-            # re-run validations
+            # re-run validations; only new or changed evidence goes back through the AI pipeline
             case.status = CaseStatus.VALIDATING
             await db.commit()
 
-            validate_case_async.delay(case_id)
+            validate_case_async.delay(case_id, incremental=True)
 
             return {"case_id": case_id, "status": case.status.value}
         except Exception as e:
@@ -1,9 +1,28 @@
 import uuid
-from sqlalchemy import select, delete
+from dataclasses import dataclass
+from sqlalchemy import select, delete, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.discrepancy import Discrepancy, DiscrepancySeverity, DiscrepancyStatus
 
 
+@dataclass(frozen=True)
+class DiscrepancyDraft:
+    field: str
+    message: str
+    expected_value: str | None = None
+    received_value: str | None = None
+    severity: DiscrepancySeverity = DiscrepancySeverity.MEDIUM
+    resolution_required: dict | bool | None = None
+
+    @property
+    def key(self) -> tuple:
+        return (self.field, self.expected_value, self.received_value)
+
+
+def _new_discrepancy_id() -> str:
+    return f"DISC-{uuid.uuid4().hex[:12].upper()}"
+
+
 class DiscrepancyService:
     async def list_open(self, case_id: str, db: AsyncSession) -> list[Discrepancy]:
         q = await db.execute(
@@ -14,14 +33,15 @@ class DiscrepancyService:
         )
         return list(q.scalars().all())
 
-    async def clear_open(self, case_id: str, db: AsyncSession):
+    async def clear_open(self, case_id: str, db: AsyncSession, commit: bool = True):
         await db.execute(
             delete(Discrepancy).where(
                 Discrepancy.case_id == case_id,
                 Discrepancy.status == DiscrepancyStatus.OPEN
             )
         )
-        await db.commit()
+        if commit:
+            await db.commit()
 
     async def create(
         self,
@@ -35,7 +55,7 @@ class DiscrepancyService:
         db: AsyncSession,
     ) -> Discrepancy:
         disc = Discrepancy(
-            discrepancy_id=f"DISC-{uuid.uuid4().hex[:12].upper()}",
+            discrepancy_id=_new_discrepancy_id(),
             case_id=case_id,
             field=field,
             message=message,
@@ -49,3 +69,87 @@ class DiscrepancyService:
         await db.commit()
         await db.refresh(disc)
         return disc
+
+    async def create_many(self, case_id: str, drafts: list[DiscrepancyDraft], db: AsyncSession) -> list[str]:
+        """
+        Inserts all drafts in a single statement without committing, so the caller
+        can commit them together with the case status update.
+        """
+        if not drafts:
+            return []
+
+        rows = [
+            {
+                "discrepancy_id": _new_discrepancy_id(),
+                "case_id": case_id,
+                "field": d.field,
+                "message": d.message,
+                "expected_value": d.expected_value,
+                "received_value": d.received_value,
+                "severity": d.severity,
+                "resolution_required": d.resolution_required,
+                "status": DiscrepancyStatus.OPEN,
+            }
+            for d in drafts
+        ]
+        await db.execute(insert(Discrepancy).values(rows))
+        return [r["discrepancy_id"] for r in rows]
+
+    async def reconcile(
+        self,
+        case_id: str,
+        drafts: list[DiscrepancyDraft],
+        db: AsyncSession,
+        fields: set[str] | None = None,
+    ) -> dict:
+        """
+        Diffs a run's discrepancies against the case's OPEN rows, keyed by
+        (field, expected_value, received_value), without committing:
+        - unchanged ones keep their row (message/severity refreshed if they differ)
+        - ones that no longer appear are marked RESOLVED
+        - new ones are inserted
+        When `fields` is given, only OPEN rows for those fields were re-evaluated
+        and may be resolved; the others are left as they are.
+        """
+        existing: dict[tuple, Discrepancy] = {}
+        stale: list[str] = []
+        for row in await self.list_open(case_id, db):
+            if fields is not None and row.field not in fields:
+                continue
+            key = (row.field, row.expected_value, row.received_value)
+            if key in existing:
+                stale.append(row.discrepancy_id)  # duplicate from an earlier run
+            else:
+                existing[key] = row
+
+        new: list[DiscrepancyDraft] = []
+        seen: set[tuple] = set()
+        kept = 0
+        for d in drafts:
+            if d.key in seen:
+                continue
+            seen.add(d.key)
+
+            row = existing.pop(d.key, None)
+            if row is None:
+                new.append(d)
+                continue
+
+            kept += 1
+            if row.message != d.message:
+                row.message = d.message
+            if row.severity != d.severity:
+                row.severity = d.severity
+            if row.resolution_required != d.resolution_required:
+                row.resolution_required = d.resolution_required
+
+        stale.extend(row.discrepancy_id for row in existing.values())
+        if stale:
+            await db.execute(
+                update(Discrepancy)
+                .where(Discrepancy.discrepancy_id.in_(stale))
+                .values(status=DiscrepancyStatus.RESOLVED)
+            )
+
+        await self.create_many(case_id, new, db)
+        return {"kept": kept, "resolved": len(stale), "inserted": len(new)}
@@ -1,6 +1,7 @@
 from app.ai.contracts.inputs import EvidenceInput
 from app.ai.contracts.outputs import DocumentClassificationResult, ConfidenceScore
 from app.ai.gemini.client import GeminiClient
+from app.ai.gemini.schemas import DocClassifierSchema
 
 
 DOC_CLASS_PROMPT = """
@@ -25,21 +26,12 @@ class GeminiDocClassifierService:
         self.client = client
 
     async def classify(self, text: str) -> DocumentClassificationResult:
-        schema = {
-            "type": "object",
-            "properties": {
-                "document_type": {"type": "string"},
-                "confidence": {"type": "number"}
-            },
-            "required": ["document_type", "confidence"]
-        }
-
-        result = self.client.generate_structured(
+        result: DocClassifierSchema = await self.client.agenerate_structured(
             prompt=f"{DOC_CLASS_PROMPT}\n\nTEXT:\n{text}",
-            schema_model=schema
+            schema_model=DocClassifierSchema
         )
 
         return DocumentClassificationResult(
-            document_type=result["document_type"],
-            confidence=ConfidenceScore(value=result["confidence"], reason="gemini_doc_classifier"),
+            document_type=result.document_type,
+            confidence=ConfidenceScore(value=result.confidence, reason="gemini_doc_classifier"),
         )
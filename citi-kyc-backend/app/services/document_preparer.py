@@ -0,0 +1,149 @@
+from __future__ import annotations
+import io
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # optional; PDFs are sent unpruned without it
+    PdfReader = PdfWriter = None
+
+
+PDF = "application/pdf"
+JPEG = "image/jpeg"
+PNG = "image/png"
+
+# Image types the multimodal providers accept as-is; anything else is re-encoded to JPEG
+LLM_IMAGE_TYPES = {JPEG, PNG, "image/webp", "image/heic", "image/heif"}
+
+# Cheap text scan for PDF pages worth sending beyond the first one
+_KYC_PAGE_RE = re.compile(
+    r"passport|date of birth|\bdob\b|nationality|address|account (holder|name)|statement|"
+    r"certificate|registration|identity|licen[cs]e",
+    re.IGNORECASE,
+)
+
+
+def detect_mime(data: bytes, declared: Optional[str] = None) -> str:
+    """MIME type from magic bytes; falls back to the declared content type."""
+    head = data[:16]
+    if head.startswith(b"%PDF"):
+        return PDF
+    if head.startswith(b"\xff\xd8\xff"):
+        return JPEG
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return PNG
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head.startswith((b"II*\x00", b"MM\x00*")):
+        return "image/tiff"
+    if head.startswith(b"BM"):
+        return "image/bmp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"heic", b"heix", b"mif1", b"msf1"):
+        return "image/heic"
+    return declared or "application/octet-stream"
+
+
+@dataclass(frozen=True)
+class PreparedDocument:
+    """Evidence bytes as they are sent to a multimodal model."""
+    data: bytes
+    mime_type: str
+    original_bytes: int
+    page_count: Optional[int] = None
+    pages_sent: Optional[List[int]] = None  # 1-based; None = all pages / not a PDF
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - len(self.data)
+
+
+def _prepare_image(data: bytes, mime_type: str) -> tuple[bytes, str]:
+    max_edge = settings.llm_image_max_long_edge
+    image = Image.open(io.BytesIO(data))
+    if mime_type in LLM_IMAGE_TYPES and max(image.size) <= max_edge:
+        return data, mime_type
+
+    image = ImageOps.exif_transpose(image)
+    if max(image.size) > max_edge:
+        image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=settings.llm_image_jpeg_quality, optimize=True)
+    encoded = out.getvalue()
+    # a small, already-compressed original can beat the re-encode
+    if mime_type in LLM_IMAGE_TYPES and len(encoded) >= len(data):
+        return data, mime_type
+    return encoded, JPEG
+
+
+def _select_pages(reader, max_pages: int) -> List[int]:
+    """First page, then pages whose text layer looks KYC-relevant, then the next pages in order."""
+    count = len(reader.pages)
+    selected = [0]
+    for i in range(1, count):
+        if len(selected) >= max_pages:
+            break
+        try:
+            text = reader.pages[i].extract_text() or ""
+        except Exception:
+            text = ""
+        if _KYC_PAGE_RE.search(text):
+            selected.append(i)
+    for i in range(1, count):
+        if len(selected) >= max_pages:
+            break
+        if i not in selected:
+            selected.append(i)
+    return sorted(selected)
+
+
+def _prepare_pdf(data: bytes) -> tuple[bytes, Optional[int], Optional[List[int]]]:
+    if PdfReader is None:
+        return data, None, None
+    reader = PdfReader(io.BytesIO(data))
+    count = len(reader.pages)
+    if count <= settings.llm_pdf_max_pages:
+        return data, count, None
+
+    pages = _select_pages(reader, settings.llm_pdf_max_pages)
+    writer = PdfWriter()
+    for i in pages:
+        writer.add_page(reader.pages[i])
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue(), count, [i + 1 for i in pages]
+
+
+def prepare_document(data: bytes, declared_type: Optional[str] = None) -> PreparedDocument:
+    """
+    Detects the real MIME type, downsamples/re-encodes large or unsupported
+    images and keeps at most `llm_pdf_max_pages` PDF pages. CPU-bound; call it
+    off the event loop. Anything that cannot be parsed is sent unchanged.
+    """
+    mime_type = detect_mime(data, declared_type)
+    if not settings.llm_upload_prep_enabled:
+        return PreparedDocument(data=data, mime_type=mime_type, original_bytes=len(data))
+
+    try:
+        if mime_type == PDF:
+            prepared, page_count, pages = _prepare_pdf(data)
+            return PreparedDocument(
+                data=prepared, mime_type=PDF, original_bytes=len(data), page_count=page_count, pages_sent=pages
+            )
+        if mime_type.startswith("image/"):
+            prepared, prepared_type = _prepare_image(data, mime_type)
+            return PreparedDocument(data=prepared, mime_type=prepared_type, original_bytes=len(data))
+    except Exception as e:
+        print(f"Document preparation failed ({mime_type}), sending original: {e}")
+
+    return PreparedDocument(data=data, mime_type=mime_type, original_bytes=len(data))
@@ -0,0 +1,212 @@
+from __future__ import annotations
+import asyncio
+import contextvars
+import os
+import tempfile
+from typing import Callable, Dict, Optional
+
+from app.core.clients import shared_s3_client
+from app.core.config import settings
+from app.services.document_preparer import PreparedDocument, prepare_document
+
+
+_CHUNK_SIZE = 1024 * 1024
+
+_current_loader: contextvars.ContextVar[Optional["EvidenceBlobLoader"]] = contextvars.ContextVar(
+    "evidence_blob_loader", default=None
+)
+
+
+class EvidenceBlobLoader:
+    """
+    Fetches each evidence object from S3 at most once per validation run.
+
+    Small objects are kept in memory; objects over `max_inline_bytes` (or beyond the
+    run's memory budget) are streamed to a temp file. A spilled object is read back
+    once for all concurrent consumers, and kept in memory afterwards while the
+    budget allows. Objects over `max_object_bytes` are rejected.
+
+    Usage:
+        async with EvidenceBlobLoader():
+            ...  # classifier / extractor / OCR read through read_evidence_bytes()
+    """
+
+    def __init__(
+        self,
+        s3=None,
+        bucket: str | None = None,
+        max_inline_bytes: int | None = None,
+        max_object_bytes: int | None = None,
+        memory_budget_bytes: int | None = None,
+    ):
+        self.s3 = s3 or shared_s3_client()
+        self.bucket = bucket or settings.s3_bucket
+        self.max_inline_bytes = max_inline_bytes or settings.evidence_blob_max_inline_bytes
+        self.max_object_bytes = max_object_bytes or settings.evidence_blob_max_object_bytes
+        self.memory_budget_bytes = memory_budget_bytes or settings.evidence_blob_memory_budget_bytes
+
+        self._inline: Dict[str, bytes] = {}
+        self._spilled: Dict[str, str] = {}
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._reading: Dict[str, asyncio.Task] = {}
+        self._prepared: Dict[str, asyncio.Task] = {}
+        self._inline_bytes = 0
+        self.fetch_count = 0
+        self._token = None
+
+    async def __aenter__(self) -> "EvidenceBlobLoader":
+        self._token = _current_loader.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        _current_loader.reset(self._token)
+        self._token = None
+        await asyncio.to_thread(self.close)
+
+    def close(self):
+        for path in self._spilled.values():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._spilled.clear()
+        self._prepared.clear()
+        self._inline.clear()
+        self._inline_bytes = 0
+
+    async def get_bytes(self, key: str) -> bytes:
+        if key not in self._inline and key not in self._spilled:
+            task = self._pending.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._load(key))
+                self._pending[key] = task
+            # shield: one cancelled caller must not abort the fetch for the others
+            await asyncio.shield(task)
+
+        if key in self._inline:
+            return self._inline[key]
+
+        # consumers of a spilled object share one read-back instead of each holding a copy
+        task = self._reading.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._read_back(key))
+            self._reading[key] = task
+        return await asyncio.shield(task)
+
+    async def _read_back(self, key: str) -> bytes:
+        try:
+            data = await asyncio.to_thread(self._read_spilled, self._spilled[key])
+            if self._inline_bytes + len(data) <= self.memory_budget_bytes:
+                self._inline[key] = data
+                self._inline_bytes += len(data)
+            return data
+        finally:
+            self._reading.pop(key, None)
+
+    async def get_prepared(self, key: str, declared_type: str | None = None) -> PreparedDocument:
+        """LLM-ready form of the object (see document_preparer), computed once per run."""
+        task = self._prepared.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._prepare(key, declared_type))
+            self._prepared[key] = task
+        return await asyncio.shield(task)
+
+    async def _prepare(self, key: str, declared_type: str | None) -> PreparedDocument:
+        data = await self.get_bytes(key)
+        prepared = await asyncio.to_thread(prepare_document, data, declared_type)
+        print(
+            f"Prepared evidence {key} for LLM: {prepared.mime_type}, {prepared.original_bytes} -> "
+            f"{len(prepared.data)} bytes, pages={prepared.pages_sent or 'all'}"
+        )
+        return prepared
+
+    async def _load(self, key: str):
+        try:
+            inline_limit = min(self.max_inline_bytes, max(0, self.memory_budget_bytes - self._inline_bytes))
+            data, path = await asyncio.to_thread(self._fetch, key, inline_limit)
+            self.fetch_count += 1
+            if path is not None:
+                self._spilled[key] = path
+            else:
+                self._inline[key] = data
+                self._inline_bytes += len(data)
+        finally:
+            self._pending.pop(key, None)
+
+    def _fetch(self, key: str, inline_limit: int) -> tuple[bytes | None, str | None]:
+        print(f"Fetching evidence blob from S3: {key}")
+        obj = self.s3.get_object(Bucket=self.bucket, Key=key)
+        body = obj["Body"]
+
+        size = obj.get("ContentLength")
+        if size is not None and size > self.max_object_bytes:
+            body.close()
+            raise RuntimeError(f"Evidence object {key} is {size} bytes, over the {self.max_object_bytes} byte limit")
+
+        buf = bytearray()
+        spill = None
+        total = 0
+        try:
+            while True:
+                chunk = body.read(_CHUNK_SIZE)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > self.max_object_bytes:
+                    raise RuntimeError(f"Evidence object {key} exceeds the {self.max_object_bytes} byte limit")
+
+                if spill is None and total > inline_limit:
+                    spill = tempfile.NamedTemporaryFile(prefix="kyc-evidence-", delete=False)
+                    spill.write(buf)
+                    buf = bytearray()
+
+                if spill is not None:
+                    spill.write(chunk)
+                else:
+                    buf.extend(chunk)
+        except Exception:
+            if spill is not None:
+                spill.close()
+                os.remove(spill.name)
+            raise
+        finally:
+            body.close()
+
+        if spill is not None:
+            spill.close()
+            return None, spill.name
+        return bytes(buf), None
+
+    @staticmethod
+    def _read_spilled(path: str) -> bytes:
+        with open(path, "rb") as fh:
+            return fh.read()
+
+
+def current_blob_loader() -> Optional[EvidenceBlobLoader]:
+    return _current_loader.get()
+
+
+async def read_evidence_bytes(key: str, fallback: Callable[[str], bytes]) -> bytes:
+    """
+    Reads evidence bytes through the active validation run's loader, or with
+    `fallback` (the plugin's own S3 download) outside of a run.
+    """
+    loader = _current_loader.get()
+    if loader is not None:
+        return await loader.get_bytes(key)
+    return fallback(key)
+
+
+async def read_prepared_evidence(
+    key: str, fallback: Callable[[str], bytes], declared_type: str | None = None
+) -> PreparedDocument:
+    """
+    Like read_evidence_bytes, but returns the downscaled / page-pruned document
+    with its detected MIME type, for multimodal LLM calls.
+    """
+    loader = _current_loader.get()
+    if loader is not None:
+        return await loader.get_prepared(key, declared_type)
+    data = await asyncio.to_thread(fallback, key)
+    return await asyncio.to_thread(prepare_document, data, declared_type)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+import hashlib
+import json
+from typing import Dict, List
+
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ai.contracts.inputs import EvidenceInput
+from app.ai.contracts.outputs import DocumentClassificationResult, ExtractedFields
+from app.db.schema import ensure_table
+from app.models.evidence_extraction import EvidenceExtraction
+from app.services.ai_result_cache_service import CachedEvidenceResult
+
+
+def fields_fingerprint(extraction_fields: List[str]) -> str:
+    return hashlib.sha256(json.dumps(sorted(extraction_fields)).encode("utf-8")).hexdigest()
+
+
+class EvidenceExtractionService:
+    """
+    Per-case record of the last classification/extraction for each evidence.
+    Incremental re-validation reuses it for evidence whose sha256 and requested
+    fields are unchanged, so only new or changed documents reach the LLM.
+    The table is created on first use.
+    """
+
+    async def load_reusable(
+        self,
+        case_id: str,
+        evidences: List[EvidenceInput],
+        extraction_fields: List[str],
+        db: AsyncSession,
+    ) -> Dict[str, CachedEvidenceResult]:
+        by_id = {ev.evidence_id: ev for ev in evidences if ev.sha256}
+        if not by_id:
+            return {}
+
+        await ensure_table(EvidenceExtraction.__table__, db)
+        fingerprint = fields_fingerprint(extraction_fields)
+        q = await db.execute(
+            select(EvidenceExtraction).where(
+                EvidenceExtraction.case_id == case_id,
+                EvidenceExtraction.evidence_id.in_(list(by_id)),
+            )
+        )
+
+        reusable = {}
+        for row in q.scalars().all():
+            ev = by_id[row.evidence_id]
+            if row.sha256 != ev.sha256 or row.fields_fingerprint != fingerprint:
+                continue
+            reusable[row.evidence_id] = CachedEvidenceResult(
+                doc_type=DocumentClassificationResult.model_validate(row.doc_type),
+                fields=ExtractedFields.model_validate(row.fields),
+            )
+        return reusable
+
+    async def save(self, case_id: str, outcomes, extraction_fields: List[str], db: AsyncSession):
+        """Upserts completed outcomes; committed together with the run's case update."""
+        fingerprint = fields_fingerprint(extraction_fields)
+        rows = [
+            {
+                "evidence_id": o.evidence.evidence_id,
+                "case_id": case_id,
+                "sha256": o.evidence.sha256,
+                "fields_fingerprint": fingerprint,
+                "doc_type": o.doc_type.model_dump(),
+                "fields": o.fields.model_dump(),
+            }
+            for o in outcomes
+            if o.evidence.sha256 and o.doc_type is not None and o.fields is not None
+        ]
+        if not rows:
+            return
+
+        await ensure_table(EvidenceExtraction.__table__, db)
+        stmt = insert(EvidenceExtraction).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[EvidenceExtraction.evidence_id],
+            set_={
+                "case_id": stmt.excluded.case_id,
+                "sha256": stmt.excluded.sha256,
+                "fields_fingerprint": stmt.excluded.fields_fingerprint,
+                "doc_type": stmt.excluded.doc_type,
+                "fields": stmt.excluded.fields,
+                "updated_at": func.now(),
+            },
+        )
+        await db.execute(stmt)
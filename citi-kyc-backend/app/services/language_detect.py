@@ -0,0 +1,53 @@
+from __future__ import annotations
+import re
+
+ENGLISH = "en"
+UNDETERMINED = "und"
+
+_WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+# Function words plus the field labels that dominate KYC documents, which are
+# mostly forms and carry few sentences
+_ENGLISH_WORDS = frozenset(
+    """
+    the of and to in for is on with by at from as be this that are or an it not
+    your you our we will all any has have was were which date name names surname
+    given birth place address account statement number issue issued expiry
+    expires nationality sex passport license licence driving card identity
+    national bill amount total balance due period customer certificate
+    registration company tax government republic authority signature holder
+    """.split()
+)
+
+# Frequent function words of the other Latin-script languages we see most
+_OTHER_WORDS = frozenset(
+    """
+    de la le les des du et pour une est dans au aux par sur avec
+    el los las del con por para es
+    der die das und von mit ist den dem zu im auf
+    di il che per della
+    da do dos em
+    van het een
+    """.split()
+)
+
+
+def detect_language(text: str, min_ratio: float = 0.08, max_foreign_letters: float = 0.15) -> str:
+    """
+    Cheap local check for OCR text: English ("en") when the text is mostly ASCII
+    letters, enough of its words are common English words and they outnumber
+    common French/Spanish/German/... words; otherwise undetermined ("und"), and
+    the translator reports the actual language.
+    """
+    letters = [ch for ch in text if ch.isalpha()]
+    if not letters:
+        return UNDETERMINED
+    if sum(1 for ch in letters if not ch.isascii()) / len(letters) > max_foreign_letters:
+        return UNDETERMINED
+
+    words = [w.lower() for w in _WORD_RE.findall(text) if len(w) > 1]
+    if not words:
+        return UNDETERMINED
+    hits = sum(1 for w in words if w in _ENGLISH_WORDS)
+    other = sum(1 for w in words if w in _OTHER_WORDS)
+    return ENGLISH if hits / len(words) >= min_ratio and hits > other else UNDETERMINED
@@ -0,0 +1,293 @@
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+from botocore.exceptions import ClientError
+
+from app.ai.contracts.inputs import EvidenceInput
+from app.ai.contracts.outputs import ConfidenceScore, DocumentClassificationResult, ExtractedFields, FieldValue
+from app.core.clients import shared_s3_client
+from app.core.config import settings
+from app.services.document_preparer import detect_mime
+from app.services.evidence_blob_loader import read_evidence_bytes
+from app.services import ocr_engine
+from app.services.ocr_preprocess import preprocess_for_ocr
+
+
+# ICAO 9303 machine readable zone: TD1 (ID cards, 3x30), TD2 (2x36), TD3 (passports, 2x44)
+MRZ_FORMATS = {"TD1": (3, 30), "TD2": (2, 36), "TD3": (2, 44)}
+
+_MRZ_CHARS_RE = re.compile(r"[^A-Z0-9<]")
+_TESSERACT_PSM = 6  # single uniform block of text
+_TESSERACT_WHITELIST = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789<"
+
+# OCR confusions in positions that must be digits
+_DIGIT_FIXES = str.maketrans({"O": "0", "Q": "0", "D": "0", "I": "1", "L": "1", "Z": "2", "S": "5", "B": "8", "G": "6"})
+
+
+def check_digit(value: str) -> str:
+    """ICAO 9303 check digit (weights 7, 3, 1; '<' = 0, A-Z = 10-35)."""
+    total = 0
+    for i, ch in enumerate(value):
+        if ch.isdigit():
+            n = int(ch)
+        elif ch.isalpha():
+            n = ord(ch) - ord("A") + 10
+        else:
+            n = 0
+        total += n * (7, 3, 1)[i % 3]
+    return str(total % 10)
+
+
+def _digits(value: str) -> str:
+    return value.translate(_DIGIT_FIXES)
+
+
+def _date(yymmdd: str, expiry: bool) -> Optional[str]:
+    if not yymmdd.isdigit():
+        return None
+    yy, mm, dd = int(yymmdd[:2]), int(yymmdd[2:4]), int(yymmdd[4:])
+    current = date.today().year % 100
+    if expiry:
+        # documents are valid for at most a few decades
+        century = 2000 if yy < current + 50 else 1900
+    else:
+        century = 1900 if yy > current else 2000
+    try:
+        return date(century + yy, mm, dd).isoformat()
+    except ValueError:
+        return None
+
+
+def _names(value: str) -> Tuple[str, str]:
+    surname, _, given = value.partition("<<")
+    return surname.replace("<", " ").strip(), given.replace("<", " ").strip()
+
+
+@dataclass
+class MRZResult:
+    format: str
+    document_code: str
+    issuing_country: str
+    surname: str
+    given_names: str
+    document_number: str
+    nationality: str
+    birth_date: Optional[str]
+    sex: str
+    expiry_date: Optional[str]
+    failed_checks: List[str] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        return not self.failed_checks and self.birth_date is not None and self.expiry_date is not None
+
+    @property
+    def full_name(self) -> str:
+        return " ".join(p for p in (self.given_names, self.surname) if p)
+
+    @property
+    def document_type(self) -> Optional[str]:
+        """None for MRZ documents we do not map (visas, crew cards...); those go to the LLM classifier."""
+        if self.document_code.startswith("P"):
+            return "passport"
+        if self.document_code[:1] in ("I", "A", "C"):
+            return "national_id"
+        return None
+
+
+def _verify(result: MRZResult, checks: Dict[str, Tuple[str, str]]) -> MRZResult:
+    for name, (value, digit) in checks.items():
+        if check_digit(value) != digit:
+            result.failed_checks.append(name)
+    return result
+
+
+def _parse_td3_td2(lines: List[str], fmt: str) -> MRZResult:
+    l1, l2 = lines
+    width = MRZ_FORMATS[fmt][1]
+    number = l2[0:9]
+    dob, expiry = _digits(l2[13:19]), _digits(l2[21:27])
+    surname, given = _names(l1[5:])
+    result = MRZResult(
+        format=fmt,
+        document_code=l1[0:2].replace("<", ""),
+        issuing_country=l1[2:5].replace("<", ""),
+        surname=surname,
+        given_names=given,
+        document_number=number.replace("<", ""),
+        nationality=l2[10:13].replace("<", ""),
+        birth_date=_date(dob, expiry=False),
+        sex=l2[20],
+        expiry_date=_date(expiry, expiry=True),
+    )
+    composite = l2[0:10] + dob + _digits(l2[19]) + expiry + _digits(l2[27]) + l2[28:width - 1]
+    checks = {
+        "document_number": (number, _digits(l2[9])),
+        "birth_date": (dob, _digits(l2[19])),
+        "expiry_date": (expiry, _digits(l2[27])),
+        "composite": (composite, _digits(l2[width - 1])),
+    }
+    # TD3 also check-digits the optional (personal number) field
+    if fmt == "TD3" and l2[28:42].strip("<"):
+        checks["personal_number"] = (l2[28:42], _digits(l2[42]))
+    return _verify(result, checks)
+
+
+def _parse_td1(lines: List[str]) -> MRZResult:
+    l1, l2, l3 = lines
+    number, number_cd = l1[5:14], l1[14]
+    if number_cd == "<":
+        # long document numbers continue into the optional field, last character is the check digit
+        overflow = l1[15:30].split("<", 1)[0]
+        number, number_cd = number + overflow[:-1], overflow[-1:] or "<"
+    dob, expiry = _digits(l2[0:6]), _digits(l2[8:14])
+    surname, given = _names(l3)
+    result = MRZResult(
+        format="TD1",
+        document_code=l1[0:2].replace("<", ""),
+        issuing_country=l1[2:5].replace("<", ""),
+        surname=surname,
+        given_names=given,
+        document_number=number.replace("<", ""),
+        nationality=l2[15:18].replace("<", ""),
+        birth_date=_date(dob, expiry=False),
+        sex=l2[7],
+        expiry_date=_date(expiry, expiry=True),
+    )
+    composite = l1[5:30] + dob + _digits(l2[6]) + expiry + _digits(l2[14]) + l2[18:29]
+    return _verify(result, {
+        "document_number": (number, _digits(number_cd)),
+        "birth_date": (dob, _digits(l2[6])),
+        "expiry_date": (expiry, _digits(l2[14])),
+        "composite": (composite, _digits(l2[29])),
+    })
+
+
+def parse_mrz(lines: List[str]) -> Optional[MRZResult]:
+    """Parses cleaned MRZ lines (TD1/TD2/TD3); returns None when no format fits."""
+    for fmt, (count, width) in MRZ_FORMATS.items():
+        if len(lines) != count or any(len(line) != width for line in lines):
+            continue
+        if fmt == "TD1":
+            return _parse_td1(lines)
+        return _parse_td3_td2(lines, fmt)
+    return None
+
+
+def _clean(line: str) -> str:
+    return _MRZ_CHARS_RE.sub("", line.upper().replace(" ", "").replace("«", "<<"))
+
+
+def _candidates(text: str) -> List[str]:
+    return [c for c in (_clean(line) for line in text.splitlines()) if len(c) >= 26 and "<" in c]
+
+
+def find_mrz(text: str) -> Optional[MRZResult]:
+    """
+    Finds the MRZ in OCR text: consecutive candidate lines are fitted to each
+    format (short lines padded with '<', OCR often drops trailing fillers) and
+    the first parse whose check digits all pass wins.
+    """
+    candidates = _candidates(text)
+    best = None
+    for fmt, (count, width) in MRZ_FORMATS.items():
+        for i in range(len(candidates) - count + 1):
+            window = candidates[i:i + count]
+            # trailing '<' fillers are the usual OCR casualty, so allow short lines more slack
+            if any(not width - 8 <= len(line) <= width + 2 for line in window):
+                continue
+            lines = [line[:width].ljust(width, "<") for line in window]
+            result = parse_mrz(lines)
+            if result is None:
+                continue
+            if result.valid:
+                return result
+            best = best or result
+    return best
+
+
+def ocr_mrz(data: bytes, mime_type: str, lang: str, backend: str) -> Optional[MRZResult]:
+    """
+    Runs in an OCR pool worker: the bottom band first, then the whole page only
+    if the band showed MRZ-like lines that did not validate (e.g. cut off).
+    """
+    image = ocr_engine.load_page(data, mime_type, 0, settings.ocr_pdf_dpi)
+    image = preprocess_for_ocr(image, ocr_engine.image_dpi(image)).convert("L")
+    width, height = image.size
+    if width < 1200:
+        # MRZ glyphs need ~20px height for reliable recognition
+        scale = 1200 / width
+        image = image.resize((1200, int(height * scale)), Image.Resampling.LANCZOS)
+        width, height = image.size
+    band = image.crop((0, int(height * 0.6), width, height))
+    for region in (band, image):
+        text, _ = ocr_engine.recognize(region, lang, backend, psm=_TESSERACT_PSM, whitelist=_TESSERACT_WHITELIST)
+        result = find_mrz(text)
+        if result is not None and result.valid:
+            return result
+        if not _candidates(text):
+            # no MRZ in the band: most documents without one stop after a single pass
+            return None
+    return None
+
+
+class MRZService:
+    """
+    Local fast path for identity documents: Tesseract reads the MRZ band and a
+    check-digit-valid MRZ fills ExtractedFields without any LLM call.
+    """
+
+    # extraction field -> MRZResult attribute
+    FIELD_MAP = {
+        "full_name": "full_name",
+        "dob": "birth_date",
+        "document_number": "document_number",
+        "issuing_country": "issuing_country",
+        "citizenship": "nationality",
+        "expiry_date": "expiry_date",
+    }
+
+    def __init__(self):
+        self.s3 = shared_s3_client()
+
+    def _download_from_s3(self, key: str) -> bytes:
+        try:
+            return self.s3.get_object(Bucket=settings.s3_bucket, Key=key)["Body"].read()
+        except ClientError as e:
+            raise RuntimeError(f"Failed to download evidence from S3 key={key}: {e}")
+
+    async def read(self, evidence: EvidenceInput) -> Optional[MRZResult]:
+        file_bytes = await read_evidence_bytes(evidence.storage_key, self._download_from_s3)
+        mime_type = detect_mime(file_bytes, evidence.content_type)
+        if not mime_type.startswith("image/"):
+            return None
+        try:
+            return await ocr_engine.run_on_ocr_pool(
+                ocr_mrz, file_bytes, mime_type, settings.mrz_tesseract_lang, ocr_engine.configured_backend()
+            )
+        except Exception as e:
+            print(f"MRZ read failed for evidence_id={evidence.evidence_id}: {e}")
+            return None
+
+    def to_results(
+        self, mrz: MRZResult, fields_to_extract: List[str]
+    ) -> Tuple[DocumentClassificationResult, ExtractedFields]:
+        confidence = settings.mrz_confidence
+        doc_type = DocumentClassificationResult(
+            document_type=mrz.document_type,
+            confidence=ConfidenceScore(value=confidence, reason=f"mrz_{mrz.format.lower()}"),
+        )
+        fields = {}
+        for name in fields_to_extract:
+            attr = self.FIELD_MAP.get(name)
+            value = getattr(mrz, attr) if attr else None
+            fields[name] = FieldValue(
+                value=value or None,
+                # fields the MRZ does not carry are reported missing, as the LLM extractor would
+                confidence=ConfidenceScore(value=confidence if value else 0.0, reason=f"mrz_{mrz.format.lower()}"),
+            )
+        return doc_type, ExtractedFields(fields=fields, meta={"extractor": "mrz", "mrz_format": mrz.format})
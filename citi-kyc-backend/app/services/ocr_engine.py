@@ -0,0 +1,296 @@
+from __future__ import annotations
+import asyncio
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import pytesseract
+from PIL import Image, ImageOps
+
+from app.ai.contracts.outputs import ConfidenceScore, OCRResult, OCRTextBlock
+from app.core.config import settings
+from app.services.document_preparer import PDF, detect_mime
+from app.services.ocr_preprocess import preprocess_for_ocr
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # optional; only image evidence can be OCR'd without it
+    pdfium = None
+
+try:
+    import tesserocr
+except ImportError:  # optional; the pytesseract backend is used without it
+    tesserocr = None
+
+
+PYTESSERACT = "pytesseract"  # one tesseract subprocess (and language data load) per page
+TESSEROCR = "tesserocr"  # warm in-process API handle per pool worker
+
+
+# pdfium is not thread-safe; only contended when the engine runs on threads
+_render_lock = threading.Lock()
+
+
+def split_pages(data: bytes, mime_type: str, limit: int) -> List[Tuple[bytes, str]]:
+    """
+    Splits a document into standalone single-page payloads (a one-page PDF or a
+    PNG frame), up to `limit` pages, so each OCR worker receives only its page.
+    A single-page document is returned as is.
+    """
+    if mime_type == PDF:
+        if pdfium is None:
+            raise RuntimeError("OCR of PDF evidence requires pypdfium2")
+        with _render_lock:
+            pdf = pdfium.PdfDocument(data)
+            try:
+                count = min(len(pdf), limit)
+                if len(pdf) == 1:
+                    return [(data, PDF)]
+                pages = []
+                for index in range(count):
+                    single = pdfium.PdfDocument.new()
+                    try:
+                        single.import_pages(pdf, [index])
+                        buf = io.BytesIO()
+                        single.save(buf)
+                    finally:
+                        single.close()
+                    pages.append((buf.getvalue(), PDF))
+                return pages
+            finally:
+                pdf.close()
+
+    image = Image.open(io.BytesIO(data))
+    count = min(getattr(image, "n_frames", 1), limit)
+    if count <= 1:
+        return [(data, mime_type)]
+    pages = []
+    for index in range(count):
+        image.seek(index)
+        buf = io.BytesIO()
+        # keep the frame's resolution so preprocessing can still scale it
+        image.save(buf, format="PNG", **({"dpi": image.info["dpi"]} if "dpi" in image.info else {}))
+        pages.append((buf.getvalue(), "image/png"))
+    return pages
+
+
+def load_page(data: bytes, mime_type: str, index: int, dpi: int) -> Image.Image:
+    """Decodes one page: a rasterized PDF page or one frame of a (multi-frame) image."""
+    if mime_type == PDF:
+        with _render_lock:
+            pdf = pdfium.PdfDocument(data)
+            try:
+                page = pdf[index]
+                image = page.render(scale=dpi / 72).to_pil()
+                page.close()
+            finally:
+                pdf.close()
+        return image
+    image = Image.open(io.BytesIO(data))
+    if index:
+        image.seek(index)
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    return image
+
+
+def image_dpi(image: Image.Image) -> Optional[int]:
+    dpi = image.info.get("dpi")
+    # cameras commonly write a placeholder 72 dpi; treat it as unknown
+    if not dpi or dpi[0] < 100:
+        return None
+    return int(dpi[0])
+
+
+def _page_text(data: Dict[str, list]) -> Tuple[str, Optional[float]]:
+    """Rebuilds reading-order text from image_to_data and its character-weighted word confidence."""
+    blocks: Dict[int, Dict[tuple, List[str]]] = {}
+    weighted = chars = 0
+    for i, word in enumerate(data["text"]):
+        word = word.strip()
+        conf = float(data["conf"][i])
+        if not word or conf < 0:
+            continue
+        line = (data["par_num"][i], data["line_num"][i])
+        blocks.setdefault(data["block_num"][i], {}).setdefault(line, []).append(word)
+        weighted += conf * len(word)
+        chars += len(word)
+    text = "\n\n".join(
+        "\n".join(" ".join(words) for words in lines.values()) for lines in blocks.values()
+    )
+    return text, (weighted / chars / 100 if chars else None)
+
+
+# tesserocr handles are not thread-safe: one per language per pool process, or per thread on the thread pool
+_tess_local = threading.local()
+
+
+def _tess_api(lang: str):
+    apis = getattr(_tess_local, "apis", None)
+    if apis is None:
+        apis = _tess_local.apis = {}
+    api = apis.get(lang)
+    if api is None:
+        api = apis[lang] = tesserocr.PyTessBaseAPI(lang=lang)
+    return api
+
+
+def _recognize_tesserocr(
+    image: Image.Image, lang: str, psm: Optional[int] = None, whitelist: Optional[str] = None
+) -> Tuple[str, Optional[float]]:
+    api = _tess_api(lang)
+    try:
+        if psm is not None:
+            api.SetPageSegMode(psm)
+        if whitelist:
+            api.SetVariable("tessedit_char_whitelist", whitelist)
+        api.SetImage(image)
+        text = api.GetUTF8Text().strip()
+        # MeanTextConf is tesseract's own character-weighted word confidence
+        return text, (api.MeanTextConf() / 100 if text else None)
+    finally:
+        api.Clear()  # drops the page, keeps the loaded language data
+        # the handle is shared with the next job on this worker
+        if psm is not None:
+            api.SetPageSegMode(tesserocr.PSM.AUTO)
+        if whitelist:
+            api.SetVariable("tessedit_char_whitelist", "")
+
+
+def recognize(
+    image: Image.Image,
+    lang: str,
+    backend: str = PYTESSERACT,
+    psm: Optional[int] = None,
+    whitelist: Optional[str] = None,
+) -> Tuple[str, Optional[float]]:
+    """Text and confidence for one image with either backend, optionally with a page segmentation mode and character whitelist."""
+    if backend == TESSEROCR:
+        return _recognize_tesserocr(image, lang, psm, whitelist)
+    config = []
+    if psm is not None:
+        config.append(f"--psm {psm}")
+    if whitelist:
+        config.append(f"-c tessedit_char_whitelist={whitelist}")
+    return _page_text(
+        pytesseract.image_to_data(image, lang=lang, config=" ".join(config), output_type=pytesseract.Output.DICT)
+    )
+
+
+def configured_backend() -> str:
+    return TESSEROCR if settings.ocr_provider == TESSEROCR and tesserocr is not None else PYTESSERACT
+
+
+def _init_worker(backend: str, lang: str):
+    # load language data once when the worker starts instead of on its first page
+    if backend == TESSEROCR and tesserocr is not None:
+        _tess_api(lang)
+
+
+def ocr_page(
+    data: bytes, mime_type: str, page: int, dpi: int, lang: str, backend: str = PYTESSERACT
+) -> OCRTextBlock:
+    """Runs in a pool worker: decode, recognize and score a single-page payload from `split_pages`."""
+    image = load_page(data, mime_type, 0, dpi)
+    image = preprocess_for_ocr(image, dpi if mime_type == PDF else image_dpi(image))
+    text, confidence = recognize(image, lang, backend)
+    return OCRTextBlock(
+        page=page,
+        text=text,
+        confidence=ConfidenceScore(
+            value=confidence or 0.0, reason=f"{backend}_word_confidence" if confidence is not None else "no_text_found"
+        ),
+    )
+
+
+_executor: Executor | None = None
+_executor_pid: int | None = None
+_executor_lock = threading.Lock()
+
+
+def get_ocr_executor() -> Executor:
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            workers = settings.ocr_max_workers or os.cpu_count() or 1
+            warm = (configured_backend(), settings.ocr_tesseract_lang)
+            # daemonic pool children (e.g. celery prefork) may not start processes of their own
+            if settings.ocr_executor == "process" and not multiprocessing.current_process().daemon:
+                # spawn: the worker loop thread makes fork unsafe
+                _executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=warm,
+                )
+            else:
+                # pytesseract runs the tesseract binary and tesserocr releases the GIL, so threads still use every core
+                _executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="kyc-ocr", initializer=_init_worker, initargs=warm
+                )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def shutdown_ocr_executor():
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None and _executor_pid == os.getpid():
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_on_ocr_pool(fn, *args):
+    """Runs a picklable OCR job on the shared OCR pool (and its warm Tesseract handles)."""
+    try:
+        return await asyncio.get_running_loop().run_in_executor(get_ocr_executor(), fn, *args)
+    except BrokenProcessPool:
+        shutdown_ocr_executor()
+        raise
+
+
+async def ocr_pages(
+    data: bytes, declared_type: Optional[str] = None, backend: str = PYTESSERACT
+) -> AsyncIterator[OCRTextBlock]:
+    """
+    OCRs every page (up to `ocr_max_pages`) in parallel on the OCR pool and
+    yields each page as soon as it is recognized, i.e. in completion order.
+    Pages not yet started are cancelled when the consumer stops early.
+    """
+    mime_type = detect_mime(data, declared_type)
+    pages = await asyncio.to_thread(split_pages, data, mime_type, settings.ocr_max_pages)
+    loop = asyncio.get_running_loop()
+    executor = get_ocr_executor()
+    futures = [
+        loop.run_in_executor(
+            executor, ocr_page, page_data, page_type, number, settings.ocr_pdf_dpi, settings.ocr_tesseract_lang, backend
+        )
+        for number, (page_data, page_type) in enumerate(pages, start=1)
+    ]
+    try:
+        for next_page in asyncio.as_completed(futures):
+            yield await next_page
+    except BrokenProcessPool:
+        # a crashed worker (OOM, tesseract abort) poisons the pool; start a fresh one next time
+        shutdown_ocr_executor()
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+async def ocr_document(data: bytes, declared_type: Optional[str] = None, backend: str = PYTESSERACT) -> OCRResult:
+    blocks = sorted([block async for block in ocr_pages(data, declared_type, backend)], key=lambda b: b.page)
+    chars = sum(len(b.text) for b in blocks)
+    confidence = sum(b.confidence.value * len(b.text) for b in blocks) / chars if chars else 0.0
+    return OCRResult(
+        language="unknown",
+        text_blocks=blocks,
+        raw_text="\n\n".join(b.text for b in blocks),
+        confidence=ConfidenceScore(value=confidence, reason=f"{backend}_{len(blocks)}_pages"),
+    )
@@ -0,0 +1,133 @@
+from __future__ import annotations
+from typing import Optional
+
+from PIL import Image
+
+from app.core.config import settings
+
+try:
+    import numpy as np
+except ImportError:  # optional; pages go to Tesseract as decoded without it
+    np = None
+
+
+# ITU-R 601 luma weights, as PIL's "L" conversion
+_LUMA = (0.299, 0.587, 0.114)
+_A4_LONG_EDGE_INCHES = 11.7
+
+
+def _grayscale(image: Image.Image) -> "np.ndarray":
+    arr = np.asarray(image, dtype=np.float32)
+    if arr.ndim == 3:
+        arr = arr[..., :3] @ np.array(_LUMA, dtype=np.float32)
+    return arr
+
+
+def _downscale(gray: "np.ndarray", factor: int) -> "np.ndarray":
+    """Area-average downscale by an integer factor (block mean)."""
+    if factor <= 1:
+        return gray
+    h, w = (gray.shape[0] // factor) * factor, (gray.shape[1] // factor) * factor
+    return gray[:h, :w].reshape(h // factor, factor, w // factor, factor).mean(axis=(1, 3))
+
+
+def _window_sum(a: "np.ndarray", r: int, axis: int) -> "np.ndarray":
+    """Sum over [i - r, i + r] along one axis via a cumulative sum, clipped at the edges."""
+    n = a.shape[axis]
+    c = np.cumsum(a, axis=axis, dtype=np.int32)
+    c = np.concatenate([np.zeros_like(np.take(c, [0], axis=axis)), c], axis=axis)
+    idx = np.arange(n)
+    return np.take(c, np.minimum(idx + r + 1, n), axis=axis) - np.take(c, np.maximum(idx - r, 0), axis=axis)
+
+
+def _binarize(gray: "np.ndarray", window: int, k: float = 0.15) -> "np.ndarray":
+    """
+    Bradley adaptive threshold: a pixel is ink when it is `k` darker than the mean
+    of its window. Separable cumulative sums make it O(1) per pixel in int32.
+    Returns True for ink.
+    """
+    r = window // 2
+    g = gray.astype(np.int32)
+    sums = _window_sum(_window_sum(g, r, 0), r, 1)
+    h, w = g.shape
+    rows = np.minimum(np.arange(h) + r + 1, h) - np.maximum(np.arange(h) - r, 0)
+    cols = np.minimum(np.arange(w) + r + 1, w) - np.maximum(np.arange(w) - r, 0)
+    area = rows[:, None].astype(np.int32) * cols[None, :].astype(np.int32)
+    return (g * area).astype(np.float32) < sums.astype(np.float32) * np.float32(1 - k)
+
+
+def _skew_angle(ink: "np.ndarray", max_degrees: float, samples: int = 20000) -> float:
+    """
+    Projection-profile skew estimate: ink pixels are projected onto the vertical
+    axis at candidate angles and the sharpest row histogram (text lines aligned)
+    wins. Coarse 0.5 degree sweep, then 0.1 degree refinement. Returns the
+    counter-clockwise rotation that levels the lines.
+    """
+    ys, xs = np.nonzero(ink)
+    if len(ys) < 100:
+        return 0.0
+    if len(ys) > samples:
+        pick = np.random.default_rng(0).choice(len(ys), samples, replace=False)
+        ys, xs = ys[pick], xs[pick]
+    ys, xs = ys.astype(np.float64), xs.astype(np.float64)
+    bins = ink.shape[0] // 2 + 1
+
+    def best(angles: "np.ndarray") -> float:
+        radians = np.deg2rad(angles)[:, None]
+        projected = ys[None, :] * np.cos(radians) - xs[None, :] * np.sin(radians)
+        scores = [np.square(np.histogram(row, bins=bins)[0]).sum() for row in projected]
+        return float(angles[int(np.argmax(scores))])
+
+    coarse = best(np.arange(-max_degrees, max_degrees + 1e-9, 0.5))
+    return best(np.arange(coarse - 0.5, coarse + 0.5 + 1e-9, 0.1))
+
+
+def _trim_dark_edges(gray: "np.ndarray", level: int = 64) -> "np.ndarray":
+    """Cuts scanner/lid shadows: dark bands along the edges that thresholding would leave hollow."""
+    rows = np.nonzero(gray.mean(axis=1) >= level)[0]
+    cols = np.nonzero(gray.mean(axis=0) >= level)[0]
+    if len(rows) == 0 or len(cols) == 0:
+        return gray
+    return gray[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+
+
+def _crop_borders(ink: "np.ndarray", margin: int, speckle: float = 0.002) -> "np.ndarray":
+    """Trims blank margins (ignoring speckle) and solid edge lines (rows/columns that are nearly all ink)."""
+    rows, cols = ink.mean(axis=1), ink.mean(axis=0)
+    content_rows = np.nonzero((rows > speckle) & (rows < 0.9))[0]
+    content_cols = np.nonzero((cols > speckle) & (cols < 0.9))[0]
+    if len(content_rows) == 0 or len(content_cols) == 0:
+        return ink
+    top, bottom = max(0, content_rows[0] - margin), min(ink.shape[0], content_rows[-1] + margin + 1)
+    left, right = max(0, content_cols[0] - margin), min(ink.shape[1], content_cols[-1] + margin + 1)
+    return ink[top:bottom, left:right]
+
+
+def preprocess_for_ocr(image: Image.Image, source_dpi: Optional[int] = None) -> Image.Image:
+    """
+    Grayscale -> downscale to `ocr_target_dpi` -> adaptive binarization ->
+    deskew -> border crop, returning a black-on-white 1-bit page for Tesseract.
+    Without a known source DPI, pages are scaled to A4 at the target DPI.
+    """
+    if np is None or not settings.ocr_preprocess_enabled:
+        return image
+
+    target_dpi = settings.ocr_target_dpi
+    gray = _grayscale(image)
+    if source_dpi:
+        factor = int(source_dpi / target_dpi)
+    else:
+        factor = int(max(gray.shape) / (_A4_LONG_EDGE_INCHES * target_dpi))
+    gray = _trim_dark_edges(np.rint(_downscale(gray, factor)).astype(np.uint8))
+
+    # window ~1/8 inch: wider than strokes, narrower than lighting gradients
+    ink = _binarize(gray, window=max(15, target_dpi // 8 | 1))
+
+    angle = _skew_angle(ink, settings.ocr_max_skew_degrees)
+    if abs(angle) >= 0.1:
+        page = Image.fromarray(ink.astype(np.uint8) * 255)
+        page = page.rotate(angle, resample=Image.Resampling.NEAREST, expand=True, fillcolor=0)
+        ink = np.asarray(page) > 127
+
+    ink = _crop_borders(ink, margin=target_dpi // 30)
+    return Image.fromarray(~ink)
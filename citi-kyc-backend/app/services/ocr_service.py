@@ -1,14 +1,16 @@
 from __future__ import annotations
-from app.ai.contracts.outputs import OCRResult, OCRTextBlock, ConfidenceScore
+from app.ai.contracts.outputs import OCRResult, OCRTextBlock
 from app.ai.contracts.inputs import EvidenceInput
 
-import pytesseract
-from PIL import Image
-import io
-import boto3
+from typing import AsyncIterator
+
+from app.core.clients import shared_s3_client
 from botocore.exceptions import ClientError
 
 from app.core.config import settings
+from app.services.evidence_blob_loader import read_evidence_bytes
+from app.services import ocr_engine
+from app.services.ocr_engine import ocr_document, ocr_pages
 
 
 class OCRProviderBase:
@@ -17,8 +19,10 @@ class OCRProviderBase:
 
 
 class TesseractOCRProvider(OCRProviderBase):
+    backend = ocr_engine.PYTESSERACT
+
     def __init__(self):
-        self.s3 = boto3.client("s3", region_name=settings.s3_region)
+        self.s3 = shared_s3_client()
 
     def _download_from_s3(self, key: str) -> bytes:
         try:
@@ -27,33 +31,49 @@ class TesseractOCRProvider(OCRProviderBase):
         except ClientError as e:
             raise RuntimeError(f"Failed to download evidence from S3 key={key}: {e}")
 
-    async def extract_text(self, evidence: EvidenceInput) -> OCRResult:
+    async def _read(self, evidence: EvidenceInput) -> bytes:
         # Download file bytes from S3 using storage key
         try:
-            file_bytes = self._download_from_s3(evidence.storage_key)
-        except RuntimeError as e:
+            file_bytes = await read_evidence_bytes(evidence.storage_key, self._download_from_s3)
+        except Exception as e:
             raise RuntimeError(f"Failed to download file from s3 for evidence_id={evidence.evidence_id}: {e}")
         print(f"Downloaded {len(file_bytes)} bytes from S3 for evidence_id={evidence.evidence_id}")
-        # Load into PIL
-        try:
-            image = Image.open(io.BytesIO(file_bytes))
-        except Exception as e:
-            raise RuntimeError(f"Failed to load image into object from S3 downloaded evidence_id={evidence.evidence_id}: {e}")
-        print(f"Image format: {image.format}, size: {image.size}, mode: {image.mode}")
+        return file_bytes
 
-        # Run OCR
+    async def extract_text(self, evidence: EvidenceInput) -> OCRResult:
+        file_bytes = await self._read(evidence)
+        # Pages are rasterized and recognized in parallel off the event loop
         try:
-            text = pytesseract.image_to_string(image)
+            result = await ocr_document(file_bytes, evidence.content_type, self.backend)
         except Exception as e:
             raise RuntimeError(f"Failed to run OCR for evidence_id={evidence.evidence_id}: {e}")
-        print(f"OCR extracted text (first 100 chars): {text[:100]}...")
-
-        return OCRResult(
-            language="unknown",
-            text_blocks=[OCRTextBlock(page=1, text=text)],
-            raw_text=text,
-            confidence=ConfidenceScore(value=0.6, reason="tesseract_local_s3"),
-        )
+        print(f"OCR extracted {len(result.text_blocks)} page(s), confidence={result.confidence.value:.2f} (first 100 chars): {result.raw_text[:100]}...")
+        return result
+
+    async def stream_pages(self, evidence: EvidenceInput) -> AsyncIterator[OCRTextBlock]:
+        """Pages in completion order, as soon as each one is recognized."""
+        file_bytes = await self._read(evidence)
+        async for block in ocr_pages(file_bytes, evidence.content_type, self.backend):
+            yield block
+
+
+class TesserocrOCRProvider(TesseractOCRProvider):
+    """
+    Same pipeline through tesserocr: each OCR worker keeps a Tesseract API handle
+    with its languages loaded, instead of starting the binary for every page.
+    """
+    backend = ocr_engine.TESSEROCR
+
+    def __init__(self):
+        if ocr_engine.tesserocr is None:
+            raise RuntimeError("ocr_provider=tesserocr requires the tesserocr package")
+        super().__init__()
+
+
+def build_ocr_provider() -> OCRProviderBase:
+    if settings.ocr_provider == "tesserocr":
+        return TesserocrOCRProvider()
+    return TesseractOCRProvider()
 
 
 class OCRService:
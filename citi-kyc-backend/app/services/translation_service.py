@@ -1,5 +1,6 @@
 from app.ai.contracts.outputs import OCRResult, TranslationResult, ConfidenceScore
 from app.ai.gemini.client import GeminiClient
+from app.ai.gemini.schemas import TranslationSchema
 
 
 TRANSLATE_PROMPT = """
@@ -17,24 +18,14 @@ class GeminiTranslationService:
         self.client = client
 
     async def translate(self, ocr: OCRResult) -> TranslationResult:
-        schema = {
-            "type": "object",
-            "properties": {
-                "source_language": {"type": "string"},
-                "translated_text": {"type": "string"},
-                "confidence": {"type": "number"}
-            },
-            "required": ["source_language", "translated_text", "confidence"]
-        }
-
-        result = self.client.generate_structured(
+        result: TranslationSchema = await self.client.agenerate_structured(
             prompt=f"{TRANSLATE_PROMPT}\n\nTEXT:\n{ocr.raw_text}",
-            schema_model=schema
+            schema_model=TranslationSchema
         )
 
         return TranslationResult(
-            source_language=result["source_language"],
+            source_language=result.source_language,
             target_language="en",
-            translated_text=result["translated_text"],
-            confidence=ConfidenceScore(value=result["confidence"], reason="gemini_translation"),
+            translated_text=result.translated_text,
+            confidence=ConfidenceScore(value=result.confidence, reason="gemini_translation"),
         )
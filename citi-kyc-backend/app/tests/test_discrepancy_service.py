@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+pytest.importorskip("aiosqlite")
+
+from app.db.base import Base
+from app.models.case import KYCCase  # referenced by discrepancies.case_id
+from app.models.discrepancy import Discrepancy, DiscrepancySeverity, DiscrepancyStatus
+from app.services.discrepancy_service import DiscrepancyDraft, DiscrepancyService
+
+CASE_ID = "CASE-1"
+
+
+def run_with_session(fn):
+    async def main():
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[KYCCase.__table__, Discrepancy.__table__])
+        try:
+            async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                return await fn(db)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def open_row(discrepancy_id, field, expected, received, message="old", severity=DiscrepancySeverity.MEDIUM):
+    return Discrepancy(
+        discrepancy_id=discrepancy_id,
+        case_id=CASE_ID,
+        field=field,
+        message=message,
+        expected_value=expected,
+        received_value=received,
+        severity=severity,
+        status=DiscrepancyStatus.OPEN,
+    )
+
+
+async def rows(db):
+    result = await db.execute(select(Discrepancy).order_by(Discrepancy.field, Discrepancy.discrepancy_id))
+    return {r.discrepancy_id: r for r in result.scalars().all()}
+
+
+def test_reconcile_keeps_resolves_and_inserts():
+    async def scenario(db):
+        db.add_all([
+            open_row("D-KEEP", "dob", "1990-01-05", "1991-01-05"),
+            open_row("D-STALE", "full_name", "Ravi Kumar", "Ravi Sharma"),
+        ])
+        await db.commit()
+
+        drafts = [
+            DiscrepancyDraft("dob", "dob differs", "1990-01-05", "1991-01-05", DiscrepancySeverity.HIGH),
+            DiscrepancyDraft("address.city", "city differs", "Mumbai", "Pune"),
+        ]
+        counts = await DiscrepancyService().reconcile(CASE_ID, drafts, db)
+        await db.commit()
+        return counts, await rows(db)
+
+    counts, after = run_with_session(scenario)
+    assert counts == {"kept": 1, "resolved": 1, "inserted": 1}
+
+    kept = after["D-KEEP"]
+    assert kept.status == DiscrepancyStatus.OPEN
+    assert (kept.message, kept.severity) == ("dob differs", DiscrepancySeverity.HIGH)
+    assert after["D-STALE"].status == DiscrepancyStatus.RESOLVED
+
+    inserted = [r for r in after.values() if r.discrepancy_id not in ("D-KEEP", "D-STALE")]
+    assert [(r.field, r.received_value, r.status) for r in inserted] == [("address.city", "Pune", DiscrepancyStatus.OPEN)]
+
+
+def test_reconcile_collapses_duplicates():
+    async def scenario(db):
+        db.add_all([
+            open_row("D-1", "dob", "1990-01-05", "1991-01-05"),
+            open_row("D-2", "dob", "1990-01-05", "1991-01-05"),
+        ])
+        await db.commit()
+
+        draft = DiscrepancyDraft("dob", "old", "1990-01-05", "1991-01-05")
+        counts = await DiscrepancyService().reconcile(CASE_ID, [draft, draft], db)
+        await db.commit()
+        return counts, await rows(db)
+
+    counts, after = run_with_session(scenario)
+    assert counts == {"kept": 1, "resolved": 1, "inserted": 0}
+    assert sorted(r.status for r in after.values()) == [DiscrepancyStatus.OPEN, DiscrepancyStatus.RESOLVED]
+
+
+def test_reconcile_without_drafts_resolves_everything_open():
+    async def scenario(db):
+        db.add(open_row("D-1", "dob", "1990-01-05", "1991-01-05"))
+        await db.commit()
+        counts = await DiscrepancyService().reconcile(CASE_ID, [], db)
+        await db.commit()
+        return counts, await rows(db)
+
+    counts, after = run_with_session(scenario)
+    assert counts == {"kept": 0, "resolved": 1, "inserted": 0}
+    assert after["D-1"].status == DiscrepancyStatus.RESOLVED
+
+
+def test_reconcile_limited_to_fields_leaves_other_rows_open():
+    async def scenario(db):
+        db.add_all([
+            open_row("D-DOB", "dob", "1990-01-05", "1991-01-05"),
+            open_row("D-EV", "evidence_processing", None, None),
+        ])
+        await db.commit()
+
+        draft = DiscrepancyDraft("evidence_processing", "Failed to process evidence EV-2", None, None)
+        counts = await DiscrepancyService().reconcile(CASE_ID, [draft], db, fields={draft.field})
+        await db.commit()
+        return counts, await rows(db)
+
+    counts, after = run_with_session(scenario)
+    assert counts == {"kept": 1, "resolved": 0, "inserted": 0}
+    assert after["D-DOB"].status == DiscrepancyStatus.OPEN
@@ -0,0 +1,105 @@
+from app.ai.contracts.outputs import ConfidenceScore, FieldValue
+from app.ai.validators.field_comparator import compare_fields, normalize_value
+
+
+def fv(value, confidence=0.95):
+    return FieldValue(value=value, confidence=ConfidenceScore(value=confidence))
+
+
+def compare(fields, profile=None, payload=None, evidence=None, min_confidence=0.9):
+    return compare_fields(fields, profile or {}, payload or {}, evidence or [], min_confidence)
+
+
+def test_normalize_value():
+    assert normalize_value("full_name", "Mr. Ravi  Kumar") == "RAVIKUMAR"
+    assert normalize_value("full_name", "Mr") == "MR"  # a lone honorific is kept
+    assert normalize_value("citizenship", "Republic of India") == "INDIA"
+    assert normalize_value("dob", "1990-1-5T00:00:00") == "19900105"
+    assert normalize_value("dob", " ") is None
+    assert normalize_value("dob", None) is None
+
+
+def test_honorifics_and_spacing_match():
+    result = compare(
+        ["full_name"],
+        profile={"full_name": "Ravi Kumar"},
+        evidence=[{"full_name": fv("SHRI RAVI KUMAR")}],
+    )
+    assert result.all_match
+    assert result.matched == ["full_name"]
+
+
+def test_country_aliases_match():
+    result = compare(
+        ["citizenship", "issuing_country"],
+        profile={"citizenship": "India", "issuing_country": "IND"},
+        evidence=[{"citizenship": fv("Indian"), "issuing_country": fv("Republic of India")}],
+    )
+    assert result.all_match
+
+
+def test_field_missing_on_both_sides_counts_as_matched():
+    result = compare(["middle_name"], profile={"full_name": "Ravi Kumar"}, evidence=[{}])
+    assert result.matched == ["middle_name"]
+
+
+def test_field_missing_from_evidence_is_ambiguous():
+    result = compare(["dob"], profile={"dob": "1990-01-05"}, evidence=[{"dob": fv(None)}])
+    assert result.ambiguous == ["dob"]
+    assert result.reasons["dob"] == "not found in evidence"
+
+
+def test_profile_and_payload_disagree():
+    result = compare(
+        ["dob"],
+        profile={"dob": "1990-01-05"},
+        payload={"dob": "1990-05-01"},
+        evidence=[{"dob": fv("1990-01-05")}],
+    )
+    assert result.reasons["dob"] == "profile and payload differ"
+
+
+def test_value_mismatch_and_low_confidence():
+    result = compare(
+        ["full_name", "dob"],
+        profile={"full_name": "Ravi Kumar", "dob": "1990-01-05"},
+        evidence=[{"full_name": fv("Ravi Kumar", 0.5), "dob": fv("1991-01-05")}],
+    )
+    assert not result.all_match
+    assert result.reasons == {"full_name": "low extraction confidence", "dob": "value mismatch"}
+
+
+def test_every_document_must_match():
+    result = compare(
+        ["full_name"],
+        profile={"full_name": "Ravi Kumar"},
+        evidence=[{"full_name": fv("Ravi Kumar")}, {"full_name": fv("Ravi Sharma")}],
+    )
+    assert result.ambiguous == ["full_name"]
+
+
+def test_nested_payload_lookup():
+    result = compare(
+        ["address.country"],
+        payload={"address": {"country": "United States"}},
+        evidence=[{"address.country": fv("USA")}],
+    )
+    assert result.all_match
+
+
+def test_city_state_leniency():
+    profile = {"address": {"city": "Mumbai", "state": "Maharashtra"}}
+    # the document shows only the state, which is accepted for the city as well
+    result = compare(
+        ["address.city", "address.state"],
+        profile=profile,
+        evidence=[{"address.state": fv("MAHARASHTRA")}],
+    )
+    assert result.all_match
+
+    # a city field that actually holds the state still matches
+    result = compare(["address.city"], profile=profile, evidence=[{"address.city": fv("Maharashtra")}])
+    assert result.all_match
+
+    result = compare(["address.city"], profile=profile, evidence=[{"address.city": fv("Pune")}])
+    assert result.reasons["address.city"] == "value mismatch"
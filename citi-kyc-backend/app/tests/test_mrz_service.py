@@ -0,0 +1,157 @@
+from datetime import date
+
+import pytest
+from PIL import Image
+
+from app.services import mrz_service
+from app.services.mrz_service import check_digit, find_mrz, parse_mrz
+
+# ICAO 9303 specimen documents (Utopia, Anna Maria Eriksson)
+TD3 = [
+    "P<UTOERIKSSON<<ANNA<MARIA<<<<<<<<<<<<<<<<<<<",
+    "L898902C36UTO7408122F1204159ZE184226B<<<<<10",
+]
+TD1 = [
+    "I<UTOD231458907<<<<<<<<<<<<<<<",
+    "7408122F1204159UTO<<<<<<<<<<<6",
+    "ERIKSSON<<ANNA<MARIA<<<<<<<<<<",
+]
+# TD1 with a 12 character document number spilling into the optional data field
+TD1_LONG_NUMBER = [
+    "I<UTOD23145890<7349<<<<<<<<<<<",
+    "7408122F1204159UTO<<<<<<<<<<<6",
+    "ERIKSSON<<ANNA<MARIA<<<<<<<<<<",
+]
+
+
+@pytest.mark.parametrize(
+    "value, digit",
+    [
+        ("L898902C3", "6"),
+        ("740812", "2"),
+        ("120415", "9"),
+        ("ZE184226B<<<<<", "1"),
+        ("D23145890", "7"),
+        ("D23145890734", "9"),
+        ("<<<<<<", "0"),
+    ],
+)
+def test_check_digit(value, digit):
+    assert check_digit(value) == digit
+
+
+def test_parse_td3_specimen():
+    result = parse_mrz(TD3)
+    assert result.valid
+    assert result.format == "TD3"
+    assert result.document_type == "passport"
+    assert result.document_number == "L898902C3"
+    assert result.issuing_country == "UTO"
+    assert result.nationality == "UTO"
+    assert result.full_name == "ANNA MARIA ERIKSSON"
+    assert result.birth_date == "1974-08-12"
+    assert result.expiry_date == "2012-04-15"
+    assert result.sex == "F"
+
+
+def test_parse_td1_specimen():
+    result = parse_mrz(TD1)
+    assert result.valid
+    assert result.format == "TD1"
+    assert result.document_type == "national_id"
+    assert result.document_number == "D23145890"
+    assert (result.surname, result.given_names) == ("ERIKSSON", "ANNA MARIA")
+
+
+def test_parse_td1_long_document_number():
+    result = parse_mrz(TD1_LONG_NUMBER)
+    assert result.valid
+    assert result.document_number == "D23145890734"
+
+
+def test_parse_reports_failed_check_digits():
+    result = parse_mrz([TD3[0], TD3[1][:9] + "7" + TD3[1][10:]])
+    assert not result.valid
+    assert "document_number" in result.failed_checks
+    assert "composite" in result.failed_checks
+
+
+def test_parse_rejects_unknown_shape():
+    assert parse_mrz(["P<UTO", "L898902C36"]) is None
+
+
+def test_document_type_unmapped_codes_fall_through():
+    result = parse_mrz(TD3)
+    result.document_code = "V"
+    assert result.document_type is None
+
+
+def test_find_mrz_in_noisy_ocr_text():
+    text = "\n".join([
+        "PASSPORT  PASSEPORT",
+        "Surname / Nom  ERIKSSON",
+        # OCR drops trailing fillers and reads a digit 0 as the letter O
+        "P<UTOERIKSSON<<ANNA<MARIA<<<<<<<<<<<<<",
+        "L898902C36UTO74O8122F12O4159ZE184226B<<<<<10",
+    ])
+    result = find_mrz(text)
+    assert result is not None and result.valid
+    assert result.birth_date == "1974-08-12"
+    assert result.expiry_date == "2012-04-15"
+
+
+def test_find_mrz_reads_spaced_td1():
+    text = "\n".join(" ".join(line) for line in TD1)
+    result = find_mrz(text)
+    assert result is not None and result.valid
+    assert result.format == "TD1"
+
+
+def test_find_mrz_without_mrz():
+    assert find_mrz("Utility bill\nAccount number 1234567890\n") is None
+
+
+@pytest.mark.parametrize(
+    "band_text, passes",
+    [
+        ("Utility bill\nAccount number 1234567890", 1),  # no MRZ-like lines: the band pass is enough
+        ("P<UTOERIKSSON<<ANNA<MARIA<<<<<<<<<<<<<<<<<<<", 2),  # cut-off MRZ: retry on the whole page
+    ],
+)
+def test_ocr_mrz_full_page_pass_only_after_mrz_like_band(monkeypatch, band_text, passes):
+    regions = []
+
+    def recognize(region, *args, **kwargs):
+        regions.append(region.size)
+        return (band_text, None)
+
+    monkeypatch.setattr(mrz_service.ocr_engine, "load_page", lambda *args: Image.new("L", (1200, 800), 255))
+    monkeypatch.setattr(mrz_service.ocr_engine, "recognize", recognize)
+    assert mrz_service.ocr_mrz(b"", "image/png", "eng", "pytesseract") is None
+    assert len(regions) == passes
+
+
+class _FixedDate(date):
+    @classmethod
+    def today(cls):
+        return cls(2026, 6, 1)
+
+
+@pytest.mark.parametrize(
+    "yymmdd, expiry, expected",
+    [
+        ("740812", False, "1974-08-12"),
+        ("200101", False, "2020-01-01"),
+        ("260101", False, "2026-01-01"),
+        ("270101", False, "1927-01-01"),  # a birth date cannot be in the future
+        ("120415", True, "2012-04-15"),
+        ("350101", True, "2035-01-01"),
+        ("750101", True, "2075-01-01"),
+        ("760101", True, "1976-01-01"),
+        ("741312", False, None),  # month 13
+        ("74O812", False, None),
+    ],
+)
+def test_date_century(monkeypatch, yymmdd, expiry, expected):
+    monkeypatch.setattr(mrz_service, "date", _FixedDate)
+    assert mrz_service._date(yymmdd, expiry) == expected
@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+pytest.importorskip("aiosqlite")
+
+from app.db.schema import ensure_table
+from app.models.ai_result_cache import AIResultCacheEntry
+
+
+def test_ensure_table_creates_missing_table_once(tmp_path):
+    async def main():
+        # a file database, since ensure_table uses its own connection
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'kyc.db'}")
+        try:
+            async with async_sessionmaker(engine)() as db:
+                await ensure_table(AIResultCacheEntry.__table__, db)
+                await ensure_table(AIResultCacheEntry.__table__, db)
+            async with engine.connect() as conn:
+                return await conn.run_sync(lambda c: inspect(c).get_table_names())
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(main()) == ["ai_result_cache"]
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 from app.core.config import settings
 
 celery_app = Celery(
@@ -8,3 +9,22 @@ celery_app = Celery(
 )
 
 celery_app.autodiscover_tasks(["app.workflows"])
+
+
+@worker_process_init.connect
+def _reset_ai_clients(**kwargs):
+    # Pool children must not share the parent's HTTP/S3/DB connections
+    from app.ai.rate_limit import reset_rate_limiters
+    from app.ai.registry import reset_registry
+    from app.db.session import engine
+    reset_registry()
+    reset_rate_limiters()
+    engine.sync_engine.dispose(close=False)
+
+
+@worker_process_shutdown.connect
+def _stop_worker_loop(**kwargs):
+    from app.services.ocr_engine import shutdown_ocr_executor
+    from app.workflows.worker_loop import shutdown_worker_loop
+    shutdown_ocr_executor()
+    shutdown_worker_loop()
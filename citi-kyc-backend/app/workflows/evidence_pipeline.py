@@ -0,0 +1,333 @@
+from __future__ import annotations
+import asyncio
+import weakref
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.ai.contracts.inputs import EvidenceInput
+from app.ai.contracts.outputs import DocumentClassificationResult, ExtractedFields
+from app.ai.instrumentation import ai_call_tags, track_served_by
+from app.ai.registry import HYBRID_PATH, MRZ_PATH, MULTIMODAL_PATH, combined_plugin, hybrid_mode
+from app.ai.validators.doc_type_validator import DocTypeValidationResult, validate_doc_type
+from app.services.ai_result_cache_service import CachedEvidenceResult
+from app.services.language_detect import ENGLISH, detect_language
+from app.services.mrz_service import MRZService
+
+
+@dataclass(frozen=True)
+class EvidenceOutcome:
+    """
+    Result of the classify -> validate -> extract pipeline for one evidence
+    """
+    evidence: EvidenceInput
+    doc_type: Optional[DocumentClassificationResult] = None
+    fields: Optional[ExtractedFields] = None
+    validation: Optional[DocTypeValidationResult] = None
+    error: Optional[Exception] = None
+    doc_type_cached: bool = False
+    fields_cached: bool = False
+    path: str = MULTIMODAL_PATH
+    served_by: Dict[str, tuple] = field(default_factory=dict)  # AI method -> (provider, model, prompt_version)
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None or (self.validation is not None and not self.validation.is_valid)
+
+
+class EvidenceSkipped(Exception):
+    """Evidence whose processing was cancelled because an earlier evidence already failed."""
+
+
+# One limiter per event loop, shared by every case validated on that loop
+_worker_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _worker_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _worker_limits.get(loop)
+    if sem is None:
+        sem = asyncio.Semaphore(max(1, settings.evidence_concurrency_per_worker))
+        _worker_limits[loop] = sem
+    return sem
+
+
+_mrz_service: Optional[MRZService] = None
+
+
+def _mrz() -> MRZService:
+    global _mrz_service
+    if _mrz_service is None:
+        _mrz_service = MRZService()
+    return _mrz_service
+
+
+async def _process_mrz(
+    ev: EvidenceInput,
+    category_id: str,
+    allowed_doc_types: List[str],
+    extraction_fields: List[str],
+) -> Optional[EvidenceOutcome]:
+    """Identity documents with a valid MRZ skip the LLM entirely; None means fall through."""
+    with ai_call_tags(evidence_id=ev.evidence_id, stage="mrz"):
+        mrz = await _mrz().read(ev)
+    if mrz is None or not mrz.valid or mrz.document_type is None:
+        return None
+    doc_type, fields = _mrz().to_results(mrz, extraction_fields)
+    print(f"MRZ {mrz.format} read for evidence {ev.evidence_id}: {doc_type}")
+
+    result = validate_doc_type(category_id, ev.evidence_id, doc_type.document_type, allowed_doc_types)
+    print(f"Document type validation for evidence {ev.evidence_id}: is_valid={result.is_valid}, message={result.message}")
+    if not result.is_valid:
+        return EvidenceOutcome(evidence=ev, doc_type=doc_type, validation=result, path=MRZ_PATH)
+    return EvidenceOutcome(evidence=ev, doc_type=doc_type, fields=fields, validation=result, path=MRZ_PATH)
+
+
+async def process_evidence(
+    registry,
+    ev: EvidenceInput,
+    category_id: str,
+    allowed_doc_types: List[str],
+    extraction_fields: List[str],
+    cached: Optional[CachedEvidenceResult] = None,
+) -> EvidenceOutcome:
+    # records which provider answered each call, so results are cached under that provider
+    with track_served_by() as served_by:
+        outcome = await _process_evidence(registry, ev, category_id, allowed_doc_types, extraction_fields, cached)
+    return replace(outcome, served_by=served_by)
+
+
+async def _process_evidence(
+    registry,
+    ev: EvidenceInput,
+    category_id: str,
+    allowed_doc_types: List[str],
+    extraction_fields: List[str],
+    cached: Optional[CachedEvidenceResult],
+) -> EvidenceOutcome:
+    cached = cached or CachedEvidenceResult()
+    combined = combined_plugin(registry)
+    try:
+        if (
+            settings.mrz_fast_path_enabled
+            and category_id in settings.mrz_fast_path_categories
+            and (cached.doc_type is None or cached.fields is None)
+        ):
+            outcome = await _process_mrz(ev, category_id, allowed_doc_types, extraction_fields)
+            if outcome is not None:
+                return outcome
+
+        if hybrid_mode(registry) and (cached.doc_type is None or cached.fields is None):
+            outcome = await _process_hybrid(registry, ev, category_id, allowed_doc_types, extraction_fields)
+            if outcome is not None:
+                return outcome
+
+        if combined is not None and (cached.doc_type is None or cached.fields is None):
+            with ai_call_tags(evidence_id=ev.evidence_id, stage="classify_extract"):
+                return await _process_combined(combined, ev, category_id, allowed_doc_types, extraction_fields)
+
+        async def _extract():
+            with ai_call_tags(evidence_id=ev.evidence_id, stage="extract"):
+                return await registry.extractor.extract_from_evidence(
+                    storage_key=ev.storage_key,
+                    fields_to_extract=extraction_fields
+                )
+
+        async def _classify():
+            with ai_call_tags(evidence_id=ev.evidence_id, stage="classify"):
+                return await registry.classifier.classify(ev)
+
+        # Speculatively start extraction alongside classification; discarded if the type is rejected
+        extract_task = None
+        if cached.fields is None and settings.speculative_extraction:
+            extract_task = asyncio.ensure_future(_extract())
+
+        try:
+            # 1️⃣ Classify document type directly from file (unless this content was classified before)
+            doc_type = cached.doc_type or await _classify()
+            print(f"Document classification for evidence {ev.evidence_id}: {doc_type}")
+
+            # 2️⃣ Validate document type against policy
+            result = validate_doc_type(category_id, ev.evidence_id, doc_type.document_type, allowed_doc_types)
+            print(f"Document type validation for evidence {ev.evidence_id}: is_valid={result.is_valid}, message={result.message}")
+            if not result.is_valid:
+                return EvidenceOutcome(
+                    evidence=ev, doc_type=doc_type, validation=result, doc_type_cached=cached.doc_type is not None
+                )
+
+            # 3️⃣ Extract structured fields directly from document
+            if cached.fields is not None:
+                fields = cached.fields
+            elif extract_task is not None:
+                fields = await extract_task
+            else:
+                fields = await _extract()
+        finally:
+            _discard(extract_task)
+
+        return EvidenceOutcome(
+            evidence=ev,
+            doc_type=doc_type,
+            fields=fields,
+            validation=result,
+            doc_type_cached=cached.doc_type is not None,
+            fields_cached=cached.fields is not None,
+        )
+
+    except Exception as e:
+        return EvidenceOutcome(evidence=ev, error=e)
+
+
+def _discard(task: Optional[asyncio.Future]):
+    if task is None:
+        return
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()  # mark retrieved; the result is no longer needed
+
+
+async def _process_combined(
+    combined,
+    ev: EvidenceInput,
+    category_id: str,
+    allowed_doc_types: List[str],
+    extraction_fields: List[str],
+) -> EvidenceOutcome:
+    # 1️⃣ + 3️⃣ Classify and extract with a single multimodal call
+    doc_type, fields = await combined.classify_and_extract(ev, extraction_fields)
+    print(f"Combined classification for evidence {ev.evidence_id}: {doc_type}")
+
+    # 2️⃣ Validate document type against policy; fields from a rejected document are dropped
+    result = validate_doc_type(category_id, ev.evidence_id, doc_type.document_type, allowed_doc_types)
+    print(f"Document type validation for evidence {ev.evidence_id}: is_valid={result.is_valid}, message={result.message}")
+    if not result.is_valid:
+        return EvidenceOutcome(evidence=ev, doc_type=doc_type, validation=result)
+
+    return EvidenceOutcome(evidence=ev, doc_type=doc_type, fields=fields, validation=result)
+
+
+async def _process_hybrid(
+    registry,
+    ev: EvidenceInput,
+    category_id: str,
+    allowed_doc_types: List[str],
+    extraction_fields: List[str],
+) -> Optional[EvidenceOutcome]:
+    """
+    OCR-first path: local OCR and language check, translation only for non-English
+    text, then text-only classification and extraction. Returns None when the OCR
+    is not usable, so the caller falls back to the multimodal path.
+    """
+    with ai_call_tags(evidence_id=ev.evidence_id, stage="ocr"):
+        try:
+            ocr = await registry.ocr.run(ev)
+        except Exception as e:
+            print(f"OCR failed for evidence {ev.evidence_id}, using multimodal path: {e}")
+            return None
+
+    text = ocr.raw_text.strip()
+    if ocr.confidence.value < settings.hybrid_min_ocr_confidence or len(text) < settings.hybrid_min_ocr_chars:
+        print(f"Low OCR confidence for evidence {ev.evidence_id} ({ocr.confidence.value:.2f}, {len(text)} chars), using multimodal path")
+        return None
+
+    language = detect_language(text)
+    if language != ENGLISH:
+        if registry.translation is None:
+            print(f"No translation provider for evidence {ev.evidence_id}, using multimodal path")
+            return None
+        with ai_call_tags(evidence_id=ev.evidence_id, stage="translate"):
+            try:
+                translation = await registry.translation.translate(ocr.model_copy(update={"language": language}))
+            except Exception as e:
+                print(f"Translation failed for evidence {ev.evidence_id}, using multimodal path: {e}")
+                return None
+        language = translation.source_language
+        text = translation.translated_text
+
+    async def _extract():
+        with ai_call_tags(evidence_id=ev.evidence_id, stage="extract_text"):
+            return await registry.extractor.extract_from_text(text, extraction_fields)
+
+    # Same speculation as the multimodal path: extraction runs alongside classification
+    extract_task = asyncio.ensure_future(_extract()) if settings.speculative_extraction else None
+    try:
+        # 1️⃣ Classify from text
+        with ai_call_tags(evidence_id=ev.evidence_id, stage="classify_text"):
+            try:
+                doc_type = await registry.classifier.classify_text(text)
+            except Exception as e:
+                print(f"Text classification failed for evidence {ev.evidence_id}, using multimodal path: {e}")
+                return None
+        print(f"Text classification for evidence {ev.evidence_id}: {doc_type}")
+
+        # 2️⃣ Validate document type against policy
+        result = validate_doc_type(category_id, ev.evidence_id, doc_type.document_type, allowed_doc_types)
+        print(f"Document type validation for evidence {ev.evidence_id}: is_valid={result.is_valid}, message={result.message}")
+        if not result.is_valid:
+            return EvidenceOutcome(evidence=ev, doc_type=doc_type, validation=result, path=HYBRID_PATH)
+
+        # 3️⃣ Extract structured fields from text
+        try:
+            fields = await extract_task if extract_task is not None else await _extract()
+        except Exception as e:
+            print(f"Text extraction failed for evidence {ev.evidence_id}, using multimodal path: {e}")
+            return None
+    finally:
+        _discard(extract_task)
+
+    meta = {**(fields.meta or {}), "ocr_confidence": round(ocr.confidence.value, 3), "source_language": language}
+    return EvidenceOutcome(
+        evidence=ev,
+        doc_type=doc_type,
+        fields=fields.model_copy(update={"meta": meta}),
+        validation=result,
+        path=HYBRID_PATH,
+    )
+
+
+async def run_evidence_pipeline(
+    registry,
+    evidences: List[EvidenceInput],
+    category_id: str,
+    allowed_doc_types: List[str],
+    extraction_fields: List[str],
+    cached: Optional[Dict[str, CachedEvidenceResult]] = None,
+) -> List[EvidenceOutcome]:
+    """
+    Fans the per-evidence pipeline out under the per-case and per-worker limits.
+    Outcomes are returned in the same order as `evidences`.
+
+    When an evidence fails, work still queued or in flight for evidences after it
+    is cancelled; those get an EvidenceSkipped outcome. Evidences before it keep
+    running, so the first failure in evidence order is always the one reported.
+    """
+    cached = cached or {}
+    case_limit = asyncio.Semaphore(max(1, settings.evidence_concurrency_per_case))
+    worker_limit = _worker_semaphore()
+
+    async def _guarded(ev: EvidenceInput) -> EvidenceOutcome:
+        async with case_limit, worker_limit:
+            return await process_evidence(
+                registry, ev, category_id, allowed_doc_types, extraction_fields, cached.get(ev.evidence_id)
+            )
+
+    tasks = [asyncio.ensure_future(_guarded(ev)) for ev in evidences]
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled() or not task.result().failed:
+                    continue
+                for later in tasks[tasks.index(task) + 1:]:
+                    later.cancel()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    return [
+        EvidenceOutcome(evidence=ev, error=EvidenceSkipped(f"Skipped evidence {ev.evidence_id} after an earlier failure"))
+        if task.cancelled() else task.result()
+        for ev, task in zip(evidences, tasks)
+    ]
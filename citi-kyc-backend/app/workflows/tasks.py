@@ -1,31 +1,63 @@
-import asyncio
 from sqlalchemy import select
 
+from app.core.config import settings
+
 from app.workflows.celery_app import celery_app
 from app.db.session import AsyncSessionLocal
 from app.models.case import KYCCase, CaseStatus
 from app.models.evidence import Evidence
 
 from app.services.customer_profile_service import CustomerProfileService
-from app.services.discrepancy_service import DiscrepancyService
+from app.services.discrepancy_service import DiscrepancyService, DiscrepancyDraft
 from app.services.policy_service import PolicyService
 
+from app.models.audit import AuditEventType
 from app.models.discrepancy import DiscrepancySeverity
 from app.ai.registry import get_registry
 from app.ai.contracts.inputs import CaseContextInput, EvidenceInput, CustomerProfileInput
-from app.ai.validators.doc_type_validator import validate_doc_type
+from app.ai.instrumentation import ai_call_tags, collect_ai_calls
+from app.ai.validators.field_comparator import compare_fields
+from app.services.ai_result_cache_service import AIResultCacheService
+from app.services.audit_logger import AuditLogger
+from app.services.evidence_blob_loader import EvidenceBlobLoader
+from app.services.evidence_extraction_service import EvidenceExtractionService
+from app.workflows.evidence_pipeline import run_evidence_pipeline
+from app.workflows.worker_loop import run_in_worker_loop
 
 
 def _run(coro):
-    return asyncio.get_event_loop().run_until_complete(coro)
+    # Shared per-process loop; see app/workflows/worker_loop.py
+    return run_in_worker_loop(coro)
 
 
 @celery_app.task(name="validate_case_async")
-def validate_case_async(case_id: str):
-    _run(_validate_case(case_id))
+def validate_case_async(case_id: str, incremental: bool = False):
+    _run(_validate_case(case_id, incremental=incremental))
+
+
+async def _validate_case(case_id: str, incremental: bool = False):
+    with collect_ai_calls() as calls, ai_call_tags(case_id=case_id):
+        try:
+            await _run_validation(case_id, incremental)
+        finally:
+            await _audit_ai_calls(case_id, calls)
+
+
+async def _audit_ai_calls(case_id: str, calls: list):
+    """One batch of AI_INVOCATION audit events per validation run."""
+    if not calls or not settings.ai_call_audit_enabled:
+        return
+    async with AsyncSessionLocal() as db:
+        await AuditLogger().log_many(
+            AuditEventType.AI_INVOCATION,
+            [c.to_payload() for c in calls],
+            db,
+            case_id=case_id,
+            actor_type="AI",
+        )
 
 
-async def _validate_case(case_id: str):
+async def _run_validation(case_id: str, incremental: bool = False):
     registry = get_registry()
 
     async with AsyncSessionLocal() as db:
@@ -34,9 +66,6 @@ async def _validate_case(case_id: str):
         if not case:
             return
 
-        # Clear previous discrepancies
-        await DiscrepancyService().clear_open(case_id, db)
-
         # Fetch policy rules
         policy = PolicyService()
         category_rules = await policy.get_category_rules(case.category_id)
@@ -51,14 +80,17 @@ async def _validate_case(case_id: str):
         evidence_objs = []
         if case.evidence_ids:
             ev_q = await db.execute(select(Evidence).where(Evidence.evidence_id.in_(case.evidence_ids)))
-            evidence_objs = list(ev_q.scalars().all())
+            # IN (...) gives no order; keep the case's evidence order, which decides the failure reported first
+            order = {evidence_id: i for i, evidence_id in enumerate(case.evidence_ids)}
+            evidence_objs = sorted(ev_q.scalars().all(), key=lambda e: order[e.evidence_id])
 
         evidences = [
             EvidenceInput(
                 evidence_id=e.evidence_id,
                 storage_key=e.storage_key,
                 content_type=e.content_type,
-                file_name=e.file_name
+                file_name=e.file_name,
+                sha256=e.sha256
             )
             for e in evidence_objs
         ]
@@ -83,60 +115,95 @@ async def _validate_case(case_id: str):
 # ----------------------------
 # Per evidence AI pipeline (Multimodal Gemini)
 # ----------------------------
+        # Unchanged documents (same sha256, provider, model, prompt) reuse earlier AI results
+        result_cache = AIResultCacheService()
+        cached = await result_cache.lookup(registry, evidences, extraction_fields, db)
+
+        # Incremental runs (resolve_case) also reuse this case's stored results for unchanged evidence
+        extractions = EvidenceExtractionService()
+        if incremental and settings.incremental_validation_enabled:
+            reusable = await extractions.load_reusable(case.internal_case_id, evidences, extraction_fields, db)
+            print(f"Incremental validation for case {case.internal_case_id}: reusing {len(reusable)} of {len(evidences)} evidences")
+            cached = {**cached, **reusable}
+
+        # Each evidence object is fetched from S3 once and shared by classifier, extractor and OCR
+        async with EvidenceBlobLoader():
+            outcomes = await run_evidence_pipeline(
+                registry, evidences, case.category_id, allowed_doc_types, extraction_fields, cached
+            )
+
+        if settings.incremental_validation_enabled:
+            await extractions.save(case.internal_case_id, outcomes, extraction_fields, db)
+        await result_cache.store(registry, outcomes, extraction_fields, db)
+
         extracted_bundle = {}
 
-        for ev in evidences:
-            try:
-                # 1️⃣ Classify document type directly from file
-                doc_type = await registry.classifier.classify(ev)
-                print(f"Document classification for evidence {ev.evidence_id}: {doc_type}")
-
-                # 2️⃣ Validate document type against policy
-                result = validate_doc_type(case.category_id, ev.evidence_id, doc_type.document_type, allowed_doc_types)
-                print(f"Document type validation for evidence {ev.evidence_id}: is_valid={result.is_valid}, message={result.message}")
-                if not result.is_valid:
-                    await DiscrepancyService().create(
-                        case_id=case.internal_case_id,
+        # Outcomes come back in evidence order, so the reported failure is deterministic
+        for outcome in outcomes:
+            ev = outcome.evidence
+
+            if outcome.error is not None:
+                e = outcome.error
+                print(f"Discrepancy in AI processing error for evidence {ev.evidence_id}: {e}")
+                await _finalize(db, case, CaseStatus.ACTION_REQUIRED, [
+                    DiscrepancyDraft(
+                        field="evidence_processing",
+                        message=f"Failed to process evidence {ev.evidence_id}: {e}",
+                        severity=DiscrepancySeverity.HIGH,
+                        resolution_required=True,
+                    )
+                ], partial=True)
+                return
+
+            result = outcome.validation
+            if not result.is_valid:
+                await _finalize(db, case, CaseStatus.ACTION_REQUIRED, [
+                    DiscrepancyDraft(
                         field=result.discrepancy_field,
                         message=result.message,
                         expected_value=result.expected_value,
                         received_value=result.received_value,
                         severity=result.severity,
                         resolution_required=result.resolution_required,
-                        db=db
                     )
-                    case.status = CaseStatus.ACTION_REQUIRED
-                    await db.commit()
-                    return
-
-                # 3️⃣ Extract structured fields directly from document
-                fields = await registry.extractor.extract_from_evidence(
-                    storage_key=ev.storage_key,
-                    fields_to_extract=extraction_fields
-                )
-
-                extracted_bundle[ev.evidence_id] = {
-                    "doc_type": doc_type.model_dump(),
-                    "fields": fields.model_dump(),
-                    "llm_confidence": 0.85  # placeholder; extractor may later return aggregate confidence
-                }
+                ], partial=True)
+                return
 
-            except Exception as e:
-                print(f"Discrepancy in AI processing error for evidence {ev.evidence_id}: {e}")
-                await DiscrepancyService().create(
-                    case_id=case.internal_case_id,
-                    field="evidence_processing",
-                    message=f"Failed to process evidence {ev.evidence_id}: {e}",
-                    severity=DiscrepancySeverity.HIGH,
-                    resolution_required=True,
-                    expected_value=None,
-                    received_value=None,
-                    db=db
-                )
-                case.status = CaseStatus.ACTION_REQUIRED
-                await db.commit()
+            extracted_bundle[ev.evidence_id] = {
+                "doc_type": outcome.doc_type.model_dump(),
+                "fields": outcome.fields.model_dump(),
+                "llm_confidence": 0.85  # placeholder; extractor may later return aggregate confidence
+            }
+
+        # ----------------------------
+        # Deterministic pre-reasoning comparison
+        # ----------------------------
+        if settings.comparator_enabled:
+            comparison = compare_fields(
+                extraction_fields,
+                profile=ctx.customer_profile.model_dump(),
+                payload=ctx.form_payload,
+                evidence_fields=[o.fields.fields for o in outcomes],
+                min_confidence=settings.comparator_min_confidence,
+            )
+            print(f"Field comparison for case {case.internal_case_id}: matched={comparison.matched}, ambiguous={comparison.reasons}")
+            if comparison.all_match:
+                # every field matches after normalization; no LLM call needed
+                await _finalize(db, case, CaseStatus.VALIDATED, [])
                 return
 
+            # the reasoner only needs to look at what the comparator could not settle
+            ctx.review_fields = comparison.ambiguous
+            extracted_bundle = {
+                evidence_id: {
+                    **item,
+                    "fields": {
+                        **item["fields"],
+                        "fields": {k: v for k, v in item["fields"]["fields"].items() if k in comparison.ambiguous},
+                    },
+                }
+                for evidence_id, item in extracted_bundle.items()
+            }
 
         # Attach extracted summary into context
         ctx.form_payload = {**ctx.form_payload, "_evidence_extracted": extracted_bundle}
@@ -145,23 +212,38 @@ async def _validate_case(case_id: str):
         # ----------------------------
         # ✅ Discrepancy reasoning (Gemini)
         # ----------------------------
-        reasoning = await registry.reasoner.reason(ctx)
+        with ai_call_tags(stage="reason"):
+            reasoning = await registry.reasoner.reason(ctx)
         print(f"Discrepancy reasoning result for case {case.internal_case_id}: confidence={reasoning.confidence.value}, discrepancies_count={len(reasoning.discrepancies)}")
 
-        if reasoning.discrepancies:
-            for d in reasoning.discrepancies:
-                await DiscrepancyService().create(
-                    case_id=case.internal_case_id,
-                    field=d.field,
-                    message=d.explanation or "Discrepancy detected",
-                    expected_value=d.expected,
-                    received_value=d.received,
-                    severity=DiscrepancySeverity[d.severity],
-                    resolution_required=d.resolution_required,
-                    db=db
-                )
-            case.status = CaseStatus.ACTION_REQUIRED
-        else:
-            case.status = CaseStatus.VALIDATED
-
-        await db.commit()
+        drafts = [
+            DiscrepancyDraft(
+                field=d.field,
+                message=d.explanation or "Discrepancy detected",
+                expected_value=d.expected,
+                received_value=d.received,
+                severity=DiscrepancySeverity[d.severity],
+                resolution_required=d.resolution_required,
+            )
+            for d in reasoning.discrepancies
+        ]
+        status = CaseStatus.ACTION_REQUIRED if drafts else CaseStatus.VALIDATED
+        await _finalize(db, case, status, drafts)
+
+
+async def _finalize(db, case: KYCCase, status: CaseStatus, drafts: list[DiscrepancyDraft], partial: bool = False):
+    """
+    Writes the run's discrepancies and the case status in one transaction,
+    so status pollers never observe a half-written run. A partial run stopped
+    early and only settles the fields of its own drafts.
+    """
+    service = DiscrepancyService()
+    if settings.discrepancy_write_mode == "replace":
+        await service.clear_open(case.internal_case_id, db, commit=False)
+        await service.create_many(case.internal_case_id, drafts, db)
+    else:
+        fields = {d.field for d in drafts} if partial else None
+        changes = await service.reconcile(case.internal_case_id, drafts, db, fields)
+        print(f"Discrepancy reconciliation for case {case.internal_case_id}: {changes}")
+    case.status = status
+    await db.commit()
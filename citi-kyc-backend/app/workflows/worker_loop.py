@@ -0,0 +1,74 @@
+from __future__ import annotations
+import asyncio
+import os
+import threading
+from typing import Awaitable, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class WorkerLoop:
+    """
+    One long-lived event loop per worker process, running on a daemon thread.
+
+    Celery task threads hand coroutines to it and block on the result, so with
+    `--pool=threads --concurrency=N` one process runs up to
+    `worker_max_concurrent_validations` validations on the same loop. The asyncpg
+    engine and pooled HTTP clients stay bound to this loop for the process lifetime.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.pid = os.getpid()
+        self.loop = asyncio.new_event_loop()
+        self._limit = asyncio.Semaphore(max(1, max_concurrency))
+        self._thread = threading.Thread(target=self._run_forever, name="kyc-worker-loop", daemon=True)
+        self._thread.start()
+
+    def _run_forever(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def _limited(self, coro: Awaitable[T]) -> T:
+        async with self._limit:
+            return await coro
+
+    def run(self, coro: Awaitable[T]) -> T:
+        return asyncio.run_coroutine_threadsafe(self._limited(coro), self.loop).result()
+
+    def stop(self):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+
+_worker_loop: WorkerLoop | None = None
+_worker_loop_lock = threading.Lock()
+
+
+def get_worker_loop() -> WorkerLoop:
+    global _worker_loop
+    with _worker_loop_lock:
+        # a loop inherited across fork has no thread behind it; start a new one
+        if _worker_loop is None or _worker_loop.pid != os.getpid():
+            _worker_loop = WorkerLoop(settings.worker_max_concurrent_validations)
+        return _worker_loop
+
+
+def run_in_worker_loop(coro: Awaitable[T]) -> T:
+    return get_worker_loop().run(coro)
+
+
+def shutdown_worker_loop():
+    global _worker_loop
+    with _worker_loop_lock:
+        worker_loop, _worker_loop = _worker_loop, None
+    if worker_loop is None or worker_loop.pid != os.getpid():
+        return
+
+    from app.db.session import engine
+    try:
+        asyncio.run_coroutine_threadsafe(engine.dispose(), worker_loop.loop).result(timeout=10)
+    finally:
+        worker_loop.stop()
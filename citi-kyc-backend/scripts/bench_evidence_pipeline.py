@@ -0,0 +1,68 @@
+"""
+Wall time of the per-evidence pipeline on the offline mock providers, sequential
+(EVIDENCE_CONCURRENCY_PER_CASE=1) against concurrent.
+
+    python scripts/bench_evidence_pipeline.py --docs 4 --latency 0.3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from app.ai.contracts.inputs import EvidenceInput  # noqa: E402
+from app.ai.registry import _build_provider  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.workflows.evidence_pipeline import run_evidence_pipeline  # noqa: E402
+
+
+def _evidences(count: int) -> list:
+    names = ["passport.jpg", "utility_bill.pdf", "license.png"]
+    return [
+        EvidenceInput(
+            evidence_id=f"EV-{i}",
+            storage_key=f"bench/{i}",
+            content_type="image/jpeg",
+            file_name=names[i % len(names)],
+        )
+        for i in range(count)
+    ]
+
+
+async def _run(registry, evidences: list, concurrency: int) -> float:
+    settings.evidence_concurrency_per_case = concurrency
+    started = time.perf_counter()
+    outcomes = await run_evidence_pipeline(
+        registry, evidences, "bench", ["passport", "utility_bill", "drivers_license"], ["full_name", "dob"]
+    )
+    elapsed = time.perf_counter() - started
+    failed = [o.evidence.evidence_id for o in outcomes if o.failed]
+    if failed:
+        raise SystemExit(f"unexpected failures: {failed}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--docs", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.3, help="simulated seconds per LLM call")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    os.environ["MOCK_AI_LATENCY_SECONDS"] = str(args.latency)
+    settings.mrz_fast_path_enabled = False
+    settings.ai_pipeline_mode = "separate"
+    registry = _build_provider("mock")
+    evidences = _evidences(args.docs)
+
+    sequential = asyncio.run(_run(registry, evidences, 1))
+    concurrent = asyncio.run(_run(registry, evidences, args.concurrency))
+    print(f"{args.docs} documents, {args.latency:.2f}s per call")
+    print(f"{'sequential':<16}{sequential:.2f}s")
+    print(f"{f'concurrency={args.concurrency}':<16}{concurrent:.2f}s  ({sequential / concurrent:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
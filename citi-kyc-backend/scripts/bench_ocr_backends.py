@@ -0,0 +1,95 @@
+"""
+OCR wall time per page for the pytesseract backend (one tesseract process per
+page) against tesserocr (warm in-process handles), on synthetic text pages run
+through ocr_engine.ocr_document. Backends that are not installed are skipped.
+
+    python scripts/bench_ocr_backends.py --pages 8 --runs 3
+"""
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import pytesseract  # noqa: E402
+from PIL import Image, ImageDraw, ImageFont  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services import ocr_engine  # noqa: E402
+
+LINE = "ACCOUNT STATEMENT  John Smith  12 Main Street Springfield  Account 0123456789"
+
+
+def _document(pages: int) -> bytes:
+    """Multi-frame 300 dpi TIFF of A4 text pages."""
+    font = ImageFont.load_default(size=32)
+    frames = []
+    for _ in range(pages):
+        image = Image.new("L", (2480, 3508), 255)
+        draw = ImageDraw.Draw(image)
+        for row in range(50):
+            draw.text((200, 200 + row * 60), LINE, font=font, fill=0)
+        frames.append(image)
+    out = io.BytesIO()
+    frames[0].save(out, format="TIFF", save_all=True, append_images=frames[1:], dpi=(300, 300), compression="tiff_lzw")
+    return out.getvalue()
+
+
+def _available() -> list:
+    backends = []
+    try:
+        pytesseract.get_tesseract_version()
+        backends.append(ocr_engine.PYTESSERACT)
+    except Exception as e:
+        print(f"skipping {ocr_engine.PYTESSERACT}: {e}")
+    if ocr_engine.tesserocr is not None:
+        backends.append(ocr_engine.TESSEROCR)
+    else:
+        print(f"skipping {ocr_engine.TESSEROCR}: package not installed")
+    return backends
+
+
+async def _bench(data: bytes, backend: str, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = await ocr_engine.ocr_document(data, "image/tiff", backend)
+        timings.append(time.perf_counter() - started)
+    print(f"  {backend}: {len(result.text_blocks)} pages, confidence {result.confidence.value:.2f}")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    backends = _available()
+    if not backends:
+        print("no OCR backend available")
+        return
+    data = _document(args.pages)
+
+    results = {}
+    try:
+        for backend in backends:
+            # the pool is sized and warmed per backend; the first run includes worker start-up
+            ocr_engine.shutdown_ocr_executor()
+            settings.ocr_provider = backend
+            results[backend] = asyncio.run(_bench(data, backend, args.runs))
+    finally:
+        ocr_engine.shutdown_ocr_executor()
+
+    print(f"{'backend':<14}{'first run':>11}{'warm avg':>11}{'per page':>11}")
+    for backend, timings in results.items():
+        warm = timings[1:] or timings
+        avg = sum(warm) / len(warm)
+        print(f"{backend:<14}{timings[0]:>10.2f}s{avg:>10.2f}s{avg / args.pages * 1000:>9.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+OpenAI request body size, client-side latency and estimated input tokens for a
+synthetic passport photo and a two page utility bill scan (both run through
+prepare_document first, as in the pipeline), comparing the old
+"[BASE64_<mime>]: ..." text appended to the prompt with the image_url / file
+content parts built by OpenAIClient._request. Latency is request build plus
+JSON serialization, and the time to upload the body at --uplink-mbps. Runs
+offline, no API calls.
+
+    python scripts/bench_openai_payload.py --uplink-mbps 20
+"""
+import argparse
+import base64
+import io
+import json
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont  # noqa: E402
+
+from app.ai.openai.client import OpenAIClient  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.services.document_preparer import prepare_document  # noqa: E402
+
+PROMPT = "Classify this KYC document and extract full_name, dob and document_number. " * 8
+
+PASSPORT_LINES = [
+    "PASSPORT  Type P  Code GBR",
+    "Surname  SMITH",
+    "Given names  JOHN",
+    "Nationality  BRITISH CITIZEN",
+    "Date of birth  14 FEB 1985",
+    "Passport No.  123456789",
+]
+MRZ_LINES = [
+    "P<GBRSMITH<<JOHN<<<<<<<<<<<<<<<<<<<<<<<<<<<<<",
+    "1234567897GBR8502149M3001012<<<<<<<<<<<<<<04",
+]
+BILL_LINES = [
+    "SPRINGFIELD ENERGY  Electricity statement",
+    "Account holder  John Smith  Account 0123456789",
+    "Supply address  12 Main Street, Springfield, 62704",
+    "Statement date 01/03/2024  Amount due 87.10",
+]
+
+
+def _image_tokens(width: int, height: int, detail: str) -> int:
+    """OpenAI's published vision cost: 85 base + 170 per 512px tile after fitting 2048 then 768 short side."""
+    if detail == "low":
+        return 85
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
+
+def _legacy_request(client: OpenAIClient, data: bytes, mime_type: str) -> dict:
+    content = f"{PROMPT}\n\n[BASE64_{mime_type}]: {base64.b64encode(data).decode()}"
+    return {
+        "model": client.model,
+        "messages": [{"role": "user", "content": content}],
+        "temperature": 0.2,
+        "max_tokens": 2048,
+        "response_format": {"type": "json_object"},
+    }
+
+
+def _timed(build) -> tuple:
+    """(request, body bytes, build + json ms)"""
+    started = time.perf_counter()
+    request = build()
+    body = json.dumps(request).encode()
+    return request, len(body), (time.perf_counter() - started) * 1000
+
+
+def _upload_ms(body: int, uplink_mbps: float) -> float:
+    return body * 8 / (uplink_mbps * 1e6) * 1000
+
+
+def _passport_photo() -> bytes:
+    """12 MP phone photo of a passport data page on a desk."""
+    image = Image.new("RGB", (4032, 3024), (92, 78, 64))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((500, 450, 3530, 2570), fill=(226, 214, 196))
+    draw.rectangle((620, 600, 1420, 1650), fill=(150, 132, 118))  # holder photo
+    font = ImageFont.load_default(size=64)
+    for row, line in enumerate(PASSPORT_LINES):
+        draw.text((1560, 620 + row * 150), line, font=font, fill=(30, 30, 40))
+    for row, line in enumerate(MRZ_LINES):
+        draw.text((620, 2150 + row * 120), line, font=font, fill=(30, 30, 40))
+    noise = Image.effect_noise(image.size, 30).convert("RGB")
+    image = Image.blend(image, noise, 0.08).filter(ImageFilter.GaussianBlur(1.2))
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=92)
+    return out.getvalue()
+
+
+def _utility_bill() -> bytes:
+    """Two page 150 dpi greyscale scan of a utility bill."""
+    font = ImageFont.load_default(size=28)
+    pages = []
+    for number in range(2):
+        page = Image.new("L", (1240, 1754), 246)
+        draw = ImageDraw.Draw(page)
+        for row in range(40):
+            draw.text((110, 140 + row * 38), BILL_LINES[(row + number) % len(BILL_LINES)], font=font, fill=25)
+        pages.append(Image.blend(page, Image.effect_noise(page.size, 20), 0.1))
+    out = io.BytesIO()
+    pages[0].save(out, format="PDF", save_all=True, append_images=pages[1:], resolution=150)
+    return out.getvalue()
+
+
+def _samples() -> list:
+    samples = []
+    for name, data in (("passport photo", _passport_photo()), ("utility bill pdf", _utility_bill())):
+        prepared = prepare_document(data)
+        size = Image.open(io.BytesIO(prepared.data)).size if prepared.mime_type.startswith("image/") else None
+        samples.append((name, prepared.data, prepared.mime_type, size))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--uplink-mbps", type=float, default=20.0, help="worker upload bandwidth to the API")
+    args = parser.parse_args()
+
+    client = OpenAIClient.__new__(OpenAIClient)
+    client.model = "gpt-4.1"
+    prompt_tokens = len(PROMPT) // 4
+    print(f"{'document':<18}{'request':<22}{'body':>10}{'build ms':>10}{'upload ms':>11}{'~input tokens':>15}")
+    for name, data, mime_type, size in _samples():
+        legacy, body, ms = _timed(lambda: _legacy_request(client, data, mime_type))
+        # base64 text is billed as text: the repo's ~4 chars per token rule, a lower bound for base64
+        tokens = len(legacy["messages"][0]["content"]) // 4
+        print(f"{name:<18}{'base64 in prompt':<22}{body / 1e6:>8.2f}MB{ms:>10.1f}{_upload_ms(body, args.uplink_mbps):>11.0f}{tokens:>15,}")
+
+        _, body, ms = _timed(lambda: client._request(PROMPT, 0.2, 2048, data, mime_type))
+        if size:
+            tokens = f"{prompt_tokens + _image_tokens(*size, settings.openai_image_detail):,}"
+        else:
+            tokens = "per page"  # PDFs are billed as page images plus their text layer
+        label = "image_url part" if size else "file part (inline)"
+        print(f"{'':<18}{label:<22}{body / 1e6:>8.2f}MB{ms:>10.1f}{_upload_ms(body, args.uplink_mbps):>11.0f}{tokens:>15}")
+
+        if not size:
+            # large PDFs are uploaded through the Files API (multipart, no base64) and referenced by id
+            _, body, ms = _timed(lambda: client._request(PROMPT, 0.2, 2048, data, mime_type, file_id="file-bench"))
+            print(
+                f"{'':<18}{'file_id (Files API)':<22}{body / 1e3:>8.2f}KB{ms:>10.1f}"
+                f"{_upload_ms(body + len(data), args.uplink_mbps):>11.0f}{'per page':>15}"
+            )
+
+
+if __name__ == "__main__":
+    main()